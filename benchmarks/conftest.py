@@ -0,0 +1,108 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Benchmarks of the emit path, run with pytest-benchmark::
+
+    python -m pytest benchmarks --benchmark-autosave
+    python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+
+Besides timings, every benchmark stores in its ``extra_info``:
+
+* ``events`` -- log records emitted per call,
+* ``ns_per_event`` -- mean time per emitted record (not recorded with
+  ``--benchmark-disable``, which collects no timings),
+* ``peak_bytes_per_event`` -- peak of memory traced by tracemalloc during
+  a call, per record, measured outside of the timed runs. This is a size
+  of memory in use at once, not a count of allocations: memory allocated
+  and freed repeatedly during a call is counted once;
+* ``retained_blocks_per_event`` -- memory blocks still allocated after
+  :data:`ALLOC_CALLS` calls, per record (a tracemalloc snapshot diff of
+  block counts), catches caches and leaks growing with every event.
+
+tracemalloc only sees live blocks, so short-lived allocations are not
+counted by either figure; compare ``ns_per_event`` for those.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import tracemalloc
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+ALLOC_CALLS = 100
+
+
+class CountingHandler(logging.Handler):
+    def __init__(self):
+        super(CountingHandler, self).__init__()
+        self.count = 0
+
+    def handle(self, record):
+        self.count += 1
+
+
+@pytest.fixture
+def handler():
+    return CountingHandler()
+
+
+@pytest.fixture
+def logger(handler):
+    logger = logging.Logger('tlogger.benchmarks', logging.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+@pytest.fixture
+def tlogger(logger):
+    from tlogger.logger import Logger
+    return Logger(logger)
+
+
+@pytest.fixture
+def measure(benchmark, handler):
+    """
+    Benchmark `func` and record per-event figures in ``extra_info``.
+    """
+    def measure(func, *args):
+        handler.count = 0
+        func(*args)
+        events = handler.count
+
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            func(*args)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+
+            before = tracemalloc.take_snapshot()
+            for _ in range(ALLOC_CALLS):
+                func(*args)
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        blocks = sum(
+            stat.count_diff
+            for stat in after.filter_traces(ignore).compare_to(
+                before.filter_traces(ignore), 'filename'))
+
+        result = benchmark(func, *args)
+
+        per = max(events, 1)
+        benchmark.extra_info['events'] = events
+        if benchmark.stats is not None:  # None with --benchmark-disable
+            benchmark.extra_info['ns_per_event'] = \
+                benchmark.stats.stats.mean * 1e9 / per
+        benchmark.extra_info['peak_bytes_per_event'] = peak / per
+        benchmark.extra_info['retained_blocks_per_event'] = \
+            blocks / (per * ALLOC_CALLS)
+        return result
+
+    return measure
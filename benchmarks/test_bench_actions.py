@@ -0,0 +1,82 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import tracemalloc
+
+import pytest
+
+from tlogger.action_stack import ContextVarActionStack, ThreadLocalActionStack
+from tlogger.actions import Action, make_action_factory
+from tlogger.compat import contextvars
+
+
+@pytest.mark.parametrize('depth', [1, 5, 20])
+def test_nested_actions(measure, logger, depth):
+    def nested():
+        actions = [
+            Action('level%d' % i, logger, context_object=nested)
+            for i in range(depth)
+        ]
+        for action in actions:
+            action.start()
+        for action in reversed(actions):
+            action.finish()
+
+    measure(nested)
+
+
+@pytest.mark.parametrize('size', [1, 10, 100])
+def test_params(measure, logger, size):
+    params = {'param%d' % i: i for i in range(size)}
+    hidden = ['param%d' % i for i in range(0, size, 3)]
+    sensitive = ['param%d' % i for i in range(1, size, 3)]
+
+    def emit():
+        action = Action('params', logger, context_object=emit,
+                        hide_params=hidden, sensitive_params=sensitive)
+        action.add_params(params)
+        action.start()
+        action.finish()
+
+    measure(emit)
+
+
+def test_decorated_action_frame(benchmark, logger):
+    def function():
+        pass
+
+    create_action = make_action_factory(Action, None, logger, function)
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        in_flight = [create_action() for _ in range(1000)]
+        size = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del in_flight
+
+    benchmark(create_action)
+    benchmark.extra_info['bytes_per_action'] = size / 1000
+
+
+@pytest.mark.parametrize('stack_class', [
+    ThreadLocalActionStack,
+    pytest.param(ContextVarActionStack, marks=pytest.mark.skipif(
+        contextvars is None, reason='contextvars module is not available')),
+])
+def test_action_stack_push_pop(benchmark, stack_class):
+    stack = stack_class()
+    action = object()
+
+    def push_pop():
+        stack.push(action)
+        stack.peek()
+        stack.root()
+        stack.pop(action)
+
+    benchmark(push_pop)
@@ -0,0 +1,57 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+import pytest
+
+from tlogger.augments import TLoggerLogRecord
+
+
+PAYLOADS = {
+    'numbers': ('event=%s id=%s status_code=%s', ('app.view.finish', 42, 0)),
+    'ascii': ('event=%s guid=%s call_params=%s',
+              ('app.view.start', '3f2b9a1c-8d4e-4f6a-9b2c-1d3e5f7a9b0c',
+               {'user': 'alice', 'page': 2})),
+    'escaped': ('event=%s raw=%s', ('app.view.info', 'line\nnext\ttab caf\xe9')),
+}
+
+
+def make_record(payload):
+    msg, args = PAYLOADS[payload]
+    return TLoggerLogRecord('bench', logging.INFO, __file__, 1, msg, args, None)
+
+
+@pytest.mark.parametrize('payload', sorted(PAYLOADS))
+def test_get_message(benchmark, payload):
+    record = make_record(payload)
+
+    def render():
+        record.__dict__.pop('_tlogger_message', None)
+        return record.getMessage()
+
+    benchmark(render)
+
+
+@pytest.mark.parametrize('payload', sorted(PAYLOADS))
+def test_get_message_cached(benchmark, payload):
+    record = make_record(payload)
+    benchmark(record.getMessage)
+
+
+@pytest.mark.parametrize('payload', sorted(PAYLOADS))
+def test_get_message_legacy(benchmark, payload):
+    """Quoting as done before the fast path, for comparison."""
+    record = make_record(payload)
+
+    def render():
+        return record.msg % tuple(
+            '"{}"'.format(str(arg).encode('unicode_escape').decode())
+            for arg in record.args
+        )
+
+    benchmark(render)
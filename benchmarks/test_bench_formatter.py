@@ -0,0 +1,31 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import time
+
+from tlogger.augments import TLoggerFormatter
+
+
+def make_record():
+    return logging.LogRecord('bench', logging.INFO, __file__, 1, 'message',
+                             (), None)
+
+
+def test_format_time(benchmark):
+    formatter = TLoggerFormatter()
+    record = make_record()
+    benchmark(formatter.formatTime, record, formatter.DATEFMT)
+
+
+def test_format_time_stdlib(benchmark):
+    """Stdlib gmtime + strftime path the formatter used before."""
+    formatter = logging.Formatter(
+        'ts=%(asctime)s.%(msecs)dZ', TLoggerFormatter.DATEFMT)
+    formatter.converter = time.gmtime
+    record = make_record()
+    benchmark(formatter.formatTime, record, formatter.datefmt)
@@ -0,0 +1,33 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+import pytest
+
+from tlogger.handlers import BatchFileHandler, RingFileHandler
+
+
+@pytest.fixture(params=['FileHandler', 'BatchFileHandler', 'RingFileHandler'])
+def file_handler(request, tmpdir):
+    path = str(tmpdir.join('bench.log'))
+    if request.param == 'FileHandler':
+        handler = logging.FileHandler(path)
+    elif request.param == 'BatchFileHandler':
+        handler = BatchFileHandler(path)
+    else:
+        handler = RingFileHandler(path)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    yield handler
+    handler.close()
+
+
+def test_file_handler(benchmark, file_handler):
+    record = logging.LogRecord('bench', logging.INFO, __file__, 1,
+                               'event=%s status_code=%s', ('start', 0), None)
+
+    benchmark(file_handler.handle, record)
@@ -0,0 +1,87 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import contextlib
+
+import pytest
+
+
+def test_decorated_call(measure, tlogger):
+    @tlogger
+    def function(a, b):
+        return a + b
+
+    measure(function, 1, 2)
+
+
+def test_decorated_call_metrics(measure, logger):
+    from tlogger.logger import Logger
+    from tlogger.metrics import Metrics
+
+    @Logger(logger, metrics=Metrics())
+    def function(a, b):
+        return a + b
+
+    measure(function, 1, 2)
+
+
+def test_decorated_call_spans_only(measure, logger):
+    from tlogger.logger import Logger
+    from tlogger.tracing import SpanExporter
+
+    exporter = SpanExporter(lambda request: None, interval=None,
+                            log_events=False)
+
+    @Logger(logger, span_exporter=exporter)
+    def function(a, b):
+        return a + b
+
+    measure(function, 1, 2)
+
+
+def test_decorate_and_call(measure, tlogger):
+    def function(a, b):
+        return a + b
+
+    measure(lambda: tlogger(function)(1, 2))
+
+
+@pytest.mark.parametrize('steps', [False, True])
+def test_iter(measure, tlogger, steps):
+    items = list(range(10))
+
+    def iterate():
+        for _ in tlogger.iter(items, steps=steps, context_object=iterate):
+            pass
+
+    measure(iterate)
+
+
+def test_context(measure, tlogger):
+    @contextlib.contextmanager
+    def manager():
+        yield
+
+    def enter():
+        with tlogger.context(manager()):
+            pass
+
+    measure(enter)
+
+
+def test_info_without_action(measure, tlogger):
+    measure(tlogger.info, 'message %s', 1)
+
+
+def test_info_with_action(measure, tlogger):
+    with tlogger.start_action('action', context_object=test_info_with_action):
+        measure(tlogger.info, 'message %s', 1)
+
+
+def test_info_level_disabled(measure, tlogger, logger):
+    logger.setLevel('WARNING')
+    measure(tlogger.info, 'message %s', 1)
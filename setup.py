@@ -68,6 +68,9 @@ setup(
     tests_require=[line.strip() for line in open('requirements-test.txt', encoding='utf-8')],
     install_requires=install_requires,
     cmdclass={'test': PyTest},
+    entry_points={
+        'console_scripts': ['tlogger-ring = tlogger.ring:main'],
+    },
     include_package_data=True,
     zip_safe=False,
 )
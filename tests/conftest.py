@@ -5,12 +5,20 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import sys
+
 import mock
 import pytest
 
 from django.conf import settings
 
 
+collect_ignore = []
+if sys.version_info < (3, 7):
+    # `async def` syntax and contextvars
+    collect_ignore.append('test_async.py')
+
+
 def pytest_configure():
     settings.configure()
 
@@ -5,6 +5,11 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import pytest
+
+from tlogger.action_binder import ContextVarActionBinder
+from tlogger.compat import contextvars
+
 
 def test_empty(action_binder):
     assert action_binder.get_action(object()) is None
@@ -54,3 +59,19 @@ def test_exit(action_binder):
     assert action_binder.__enter__() is action_binder
     action_binder.__exit__(None, None, None)
     assert action_binder.get_action(action_binder.func) is None
+
+
+@pytest.mark.skipif(contextvars is None,
+                    reason='contextvars module is not available')
+def test_context_var_binder_isolates_contexts(function):
+    a, b = object(), object()
+
+    def bind_in_copy():
+        token = ContextVarActionBinder.bind(function, b)
+        assert ContextVarActionBinder.get_action(function) is b
+        ContextVarActionBinder.unbind(token)
+
+    with ContextVarActionBinder(function, a):
+        contextvars.copy_context().run(bind_in_copy)
+        assert ContextVarActionBinder.get_action(function) is a
+    assert ContextVarActionBinder.get_action(function) is None
@@ -7,11 +7,18 @@ from __future__ import unicode_literals
 
 import pytest
 
+from tlogger.action_stack import ActionStackWarning
 
-@pytest.fixture
-def action_stack():
-    from tlogger.action_stack import ThreadLocalActionStack
-    return ThreadLocalActionStack()
+
+@pytest.fixture(params=['ThreadLocalActionStack', 'ContextVarActionStack'])
+def action_stack(request):
+    from tlogger import action_stack as module
+    from tlogger.compat import contextvars
+
+    if request.param == 'ContextVarActionStack' and contextvars is None:
+        pytest.skip('contextvars module is not available')
+
+    return getattr(module, request.param)()
 
 
 def test_empty(action_stack):
@@ -69,11 +76,17 @@ def test_pop_restricted(action_stack):
     action_stack.pop(c)
     assert action_stack.peek() is b
     assert action_stack.root() is a
-    action_stack.pop(a)
+    with pytest.warns(ActionStackWarning):
+        action_stack.pop(a)
     assert action_stack.peek() is b
     assert action_stack.root() is a
 
 
+def test_pop_from_empty_stack_warns(action_stack):
+    with pytest.warns(ActionStackWarning):
+        assert action_stack.pop(object()) is None
+
+
 def test_thread_start(action_stack):
     """
     Each thread starts with an empty action stack.
@@ -116,3 +129,16 @@ def test_thread_safety(action_stack):
     # Neither thread was affected by the other:
     assert values_in_thread == [second]
     assert action_stack.peek() is first
+
+
+def test_pop_empty(action_stack):
+    with pytest.raises(IndexError):
+        action_stack.pop()
+
+
+def test_clear(action_stack):
+    action_stack.push(object())
+    action_stack.push(object())
+    action_stack.clear()
+    assert action_stack.peek() is None
+    assert action_stack.root() is None
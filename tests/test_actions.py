@@ -220,3 +220,185 @@ def test__action__exit__calls_fail(action):
     with mock.patch.object(action, 'fail') as fail:
         action.__exit__(exc_type, exc_val, exc_tb)
     fail.assert_called_once_with(exc_type, exc_val, exc_tb)
+
+
+def test__action__emit_event__skipped_when_level_disabled(action):
+    with mock.patch.object(action, 'get_logger') as get_logger:
+        get_logger.return_value.isEnabledFor.return_value = False
+        with mock.patch.object(action, '_event_context') as event_context:
+            action.emit_event('event', level=Level.debug)
+
+    get_logger.return_value.isEnabledFor.assert_called_once_with(
+        Level.debug.value)
+    assert event_context.call_count == 0
+    assert get_logger.return_value.log.call_count == 0
+
+
+def test__action__fail__pops_self_when_level_disabled(action):
+    with mock.patch.object(action, 'get_logger') as get_logger:
+        get_logger.return_value.isEnabledFor.return_value = False
+        with mock.patch.object(action, 'action_stack') as stack:
+            action.fail(Exception, Exception('Waaagh!'))
+
+    stack.pop.assert_called_once_with(action)
+    assert get_logger.return_value.log.call_count == 0
+
+
+def test__action__uid_item__cached(action):
+    item = action.uid_item
+    assert action.uid_item is item
+    assert item == {'guid': action.uid}
+
+
+def test__action__uid_item__follows_uid_change(action):
+    action.uid_item
+    action.uid_field_name, action.uid = 'id', 'spam'
+    assert action.uid_item == {'id': 'spam'}
+
+
+def test__action__event_context__uses_root_uid(action, action_stack, logger):
+    root = Action('root', logger, uid='root-uid', action_stack=action_stack,
+                  context_object=test__action__event_context__uses_root_uid)
+    action_stack.push(root)
+
+    assert action._event_context('event')['id'] == 'root-uid'
+
+
+def test__action__guid_factory(logger):
+    class CustomAction(Action):
+        guid_factory = staticmethod(lambda: 'custom')
+
+    a = CustomAction.create_ad_hoc(logger, context_object=test__action__guid_factory)
+    assert a.uid_item == {'guid': 'custom'}
+
+
+def test__action__event_context__filters_params(logger, action_stack):
+    a = Action('name', logger, action_stack=action_stack,
+               context_object=test__action__event_context__filters_params,
+               hide_params=['hidden'], sensitive_params=['password'])
+    a.add_params(hidden=1, password='secret', visible=2)
+    a.add_result(3)
+
+    context = a._event_context('start', include_params=True)
+    assert context['call_params'] == {'password': '******', 'visible': 2}
+    assert context['result'] == 3
+
+
+def test__action__event_context__empty_call_params(action):
+    context = action._event_context('start', include_params=True)
+    assert context['call_params'] == {}
+
+
+def test__action__event_context__hidden_call_params(logger, action_stack):
+    a = Action('name', logger, action_stack=action_stack,
+               context_object=test__action__event_context__hidden_call_params,
+               hide_params=['call_params'])
+    a.add_params(secret=1)
+
+    context = a._event_context('start', include_params=True)
+    assert context['call_params'] == {}
+
+
+def test__action__slots(action):
+    assert 'name' in Action.__slots__
+    assert not action.__dict__
+    assert repr(action).startswith("Action('action_name'")
+
+
+def test__action__from_spec(logger, action_stack):
+    spec = Action.make_spec('name', logger, test__action__from_spec,
+                            action_stack=action_stack, params={'a': 1},
+                            hide_params=['hidden'])
+    assert spec.full_name == Action.build_full_name('name',
+                                                    test__action__from_spec)
+
+    first, second = Action.from_spec(spec), Action.from_spec(spec)
+    first.add_params(b=2)
+
+    assert first.params == {'a': 1, 'call_params': {'b': 2}}
+    assert second.params == spec.params == {'a': 1}
+    assert first.param_filter is second.param_filter is spec.param_filter
+    assert first.uid is None and first.status_code == 0
+    assert first._get_full_name() == spec.full_name
+
+
+def test__make_action_factory__uses_spec(logger):
+    from tlogger.actions import make_action_factory
+
+    class CustomAction(Action):
+        pass
+
+    create_action = make_action_factory(
+        CustomAction, 'name', logger, test__make_action_factory__uses_spec)
+
+    with mock.patch.object(CustomAction, '__init__') as init:
+        action = create_action()
+
+    assert not init.called
+    assert isinstance(action, CustomAction)
+    assert action.name == 'name'
+
+
+def test__make_action_factory__custom_init(logger):
+    from tlogger.actions import make_action_factory
+
+    class CustomAction(Action):
+        def __init__(self, *args, **kwargs):
+            super(CustomAction, self).__init__(*args, **kwargs)
+            self.extra = 'extra'
+
+    create_action = make_action_factory(
+        CustomAction, 'name', logger, test__make_action_factory__custom_init)
+
+    assert create_action().extra == 'extra'
+
+
+def test__action__finish__emits_duration(action):
+    with mock.patch('tlogger.actions.perf_counter_ns',
+                    side_effect=[1000000, 3500000]):
+        action.start()
+        context = action._event_context('finish', include_status=True)
+
+    assert context['duration_ms'] == 2.5
+    assert 'cpu_ms' not in context
+    assert 'duration_ms' not in action._event_context('start',
+                                                      include_params=True)
+
+
+def test__action__finish__emits_cpu_time(logger, action_stack):
+    class CPUTimeAction(Action):
+        measure_cpu_time = True
+
+    action = CPUTimeAction('name', logger, action_stack=action_stack,
+                           context_object=test__action__finish__emits_cpu_time)
+    with mock.patch('tlogger.actions.thread_time_ns', side_effect=[0, 2000000]):
+        action.start()
+        context = action._event_context('finish', include_status=True)
+
+    assert context['cpu_ms'] == 2.0
+
+
+def test__action__fail__emits_duration(action):
+    action.start()
+    with mock.patch.object(action, 'get_logger') as get_logger:
+        action.fail(Exception, Exception('Waaagh!'))
+
+    assert 'duration_ms=%s' in get_logger.return_value.log.call_args[0][1]
+
+
+@pytest.mark.parametrize('elapsed_ms, level', [
+    (50, Level.info),
+    (150, Level.warning),
+])
+def test__action__finish__escalates_slow(logger, action_stack, elapsed_ms,
+                                         level):
+    action = Action('name', logger, action_stack=action_stack,
+                    slow_threshold=100,
+                    context_object=test__action__finish__escalates_slow)
+    with mock.patch('tlogger.actions.perf_counter_ns',
+                    side_effect=[0, elapsed_ms * 1000000]):
+        action.start()
+        with mock.patch.object(action, 'emit_event') as emit_event:
+            action.finish()
+
+    assert emit_event.call_args[1].get('level', action.level) is level
@@ -0,0 +1,286 @@
+# -*- mode: python; coding: utf-8; -*-
+
+import asyncio
+
+import mock
+import pytest
+
+from tlogger.action_stack import ContextVarActionStack
+from tlogger.decorators import wrap_function
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_action_stack_tasks_isolation():
+    """
+    Concurrent tasks on one event loop get their own action stacks.
+    """
+    action_stack = ContextVarActionStack()
+    root = object()
+    action_stack.push(root)
+    seen = {}
+
+    async def task(action):
+        action_stack.push(action)
+        await asyncio.sleep(0)
+        seen[action] = (action_stack.peek(), action_stack.root())
+        action_stack.pop(action)
+
+    first, second = object(), object()
+
+    async def main():
+        await asyncio.gather(task(first), task(second))
+
+    run(main())
+
+    assert seen == {first: (first, root), second: (second, root)}
+    assert action_stack.peek() is root
+
+
+def test_wrapped_coroutine_function_logs_awaited_result():
+    action_class = mock.MagicMock()
+
+    async def coroutine(arg):
+        await asyncio.sleep(0)
+        return arg * 2
+
+    wrapped = wrap_function(coroutine, action_class, mock.Mock())
+
+    assert asyncio.iscoroutinefunction(wrapped)
+    assert run(wrapped(21)) == 42
+
+    action = action_class.return_value
+    action.add_params.assert_called_once_with({'arg': 21})
+    action.add_result.assert_called_once_with(42)
+    action.__exit__.assert_called_once_with(None, None, None)
+
+
+def test_wrapped_coroutine_function_fails_on_exception():
+    action_class = mock.MagicMock()
+    action_class.return_value.__exit__.return_value = False
+
+    async def coroutine():
+        await asyncio.sleep(0)
+        raise ValueError('Bang!')
+
+    wrapped = wrap_function(coroutine, action_class, mock.Mock())
+
+    with pytest.raises(ValueError):
+        run(wrapped())
+
+    action = action_class.return_value
+    assert action.__exit__.call_args[0][0] is ValueError
+    assert action.add_result.call_count == 0
+
+
+def test_wrapped_async_generator_function():
+    action_class = mock.MagicMock()
+
+    async def agen(count):
+        for i in range(count):
+            await asyncio.sleep(0)
+            yield i
+
+    wrapped = wrap_function(agen, action_class, mock.Mock())
+    action = action_class.return_value
+
+    async def main():
+        items = []
+        async for item in wrapped(3):
+            assert action.start.call_count == 1
+            assert action.finish.call_count == 0
+            items.append(item)
+        return items
+
+    assert run(main()) == [0, 1, 2]
+    action.finish.assert_called_once_with()
+    assert action.fail.call_count == 0
+
+
+def test_wrapped_async_generator_function_fails_on_exception():
+    action_class = mock.MagicMock()
+
+    async def agen():
+        yield 1
+        raise ValueError('Bang!')
+
+    wrapped = wrap_function(agen, action_class, mock.Mock())
+    action = action_class.return_value
+
+    async def main():
+        async for _ in wrapped():
+            pass
+
+    with pytest.raises(ValueError):
+        run(main())
+
+    assert action.fail.call_args[0][0] is ValueError
+    assert action.finish.call_count == 0
+
+
+def test_logger_aiter_with_steps():
+    from tlogger.logger import Logger
+
+    async def agen():
+        for i in range(3):
+            yield i
+
+    tlogger = Logger(mock.Mock())
+
+    async def main():
+        proxy = tlogger.aiter(agen(), steps=True,
+                              context_object=test_logger_aiter_with_steps)
+        with mock.patch.object(proxy, '_action') as action:
+            items = [item async for item in proxy]
+        return items, action
+
+    items, action = run(main())
+    assert items == [0, 1, 2]
+    action.start.assert_called_once_with()
+    action.finish.assert_called_once_with()
+    assert action.emit_event.call_count == 3
+
+
+def test_overlapping_calls_of_wrapped_coroutine_function():
+    from tlogger.logger import Logger
+
+    tlogger = Logger(mock.Mock())
+    seen = []
+
+    @tlogger
+    async def coroutine(delay):
+        action = tlogger.action_for(coroutine)
+        await asyncio.sleep(delay)
+        assert tlogger.action_for(coroutine) is action
+        seen.append(action.params['call_params']['delay'])
+        return delay
+
+    async def main():
+        return await asyncio.gather(coroutine(0.02), coroutine(0.01))
+
+    assert run(main()) == [0.02, 0.01]
+    assert seen == [0.01, 0.02]
+    assert tlogger.action_for(coroutine) is None
+
+
+def test_wrapped_async_generator_function_binds_action_per_step():
+    from tlogger.logger import Logger
+
+    tlogger = Logger(mock.Mock())
+
+    @tlogger
+    async def agen():
+        for i in range(2):
+            assert tlogger.action_for(agen) is not None
+            yield i
+
+    async def main():
+        items = []
+        async for item in agen():
+            assert tlogger.action_for(agen) is None
+            items.append(item)
+        return items
+
+    assert run(main()) == [0, 1]
+
+
+def test_logger_aiter_fails_on_exception():
+    from tlogger.logger import Logger
+
+    async def agen():
+        yield 1
+        raise ValueError('Bang!')
+
+    tlogger = Logger(mock.Mock())
+
+    async def main():
+        proxy = tlogger.aiter(agen(),
+                              context_object=test_logger_aiter_fails_on_exception)
+        with mock.patch.object(proxy, '_action') as action:
+            with pytest.raises(ValueError):
+                async for _ in proxy:
+                    pass
+        return action
+
+    action = run(main())
+    assert action.fail.call_args[0][0] is ValueError
+    assert action.finish.call_count == 0
+
+
+def test_logger_context_async_with():
+    from tlogger.logger import Logger
+
+    class AsyncContextManager(object):
+        entered = exited = False
+
+        async def __aenter__(self):
+            self.entered = True
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            self.exited = True
+
+    real = AsyncContextManager()
+    tlogger = Logger(mock.Mock())
+    proxy = tlogger.context(real)
+
+    async def main():
+        with mock.patch.object(proxy, '_action') as action:
+            async with proxy:
+                assert real.entered
+                action.start.assert_called_once_with('enter')
+        return action
+
+    action = run(main())
+    assert real.exited
+    action.finish.assert_called_once_with('exit')
+
+
+def test_request_middleware_async():
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from tlogger.action_binder import ActionBinder
+    from tlogger.django.middleware import RequestActionMiddleware
+
+    logger = mock.Mock()
+    middleware_class = type(str('Middleware'), (RequestActionMiddleware,),
+                            {'logger': logger})
+
+    async def get_response(request):
+        assert ActionBinder.get_action(request) is not None
+        return HttpResponse(status=202)
+
+    middleware = middleware_class(get_response)
+    assert asyncio.iscoroutinefunction(middleware)
+
+    request = RequestFactory().get('/', HTTP_REQUEST_ID='deadbeef')
+    response = asyncio.run(middleware(request))
+
+    assert response.status_code == 202
+    finish_args = logger.log.call_args[0]
+    assert 'status_code=%s' in finish_args[1]
+    assert 202 in finish_args
+    assert 'deadbeef' in finish_args
+
+
+def test_request_middleware_async_fails():
+    from django.test import RequestFactory
+    from tlogger.django.middleware import RequestActionMiddleware
+
+    logger = mock.Mock()
+    middleware_class = type(str('Middleware'), (RequestActionMiddleware,),
+                            {'logger': logger})
+
+    async def get_response(request):
+        raise ValueError('boom')
+
+    middleware = middleware_class(get_response)
+    with pytest.raises(ValueError):
+        asyncio.run(middleware(RequestFactory().get('/')))
+
+    assert '.error' in str(logger.log.call_args[0])
@@ -0,0 +1,109 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+import mock
+import pytest
+
+from tlogger.augments import TLoggerFormatter, TLoggerLogger, TLoggerLogRecord
+from tlogger.serializers import escape_inline
+
+
+def legacy_escape(value):
+    return str(value).encode('unicode_escape').decode()
+
+
+@pytest.mark.parametrize('value', [
+    1, -2.5, True, None, 'plain', 'with "quotes"', 'back\\slash', 'tab\there',
+    'new\nline', '\x7f', 'caf\xe9', '☃', '\U0001f600', b'bytes', [1, 'a'],
+])
+def test_escape_inline_matches_unicode_escape(value):
+    assert escape_inline(value) == legacy_escape(value)
+
+
+def make_record(msg, *args):
+    return TLoggerLogRecord('name', logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_get_message_quotes_arguments():
+    record = make_record('a=%s b=%s', 1, 'x\ny')
+    assert record.getMessage() == 'a="1" b="x\\ny"'
+
+
+def test_get_message_without_arguments():
+    assert make_record('message').getMessage() == 'message'
+
+
+def test_get_message_cached():
+    record = make_record('a=%s', 1)
+    assert record.getMessage() is record.getMessage()
+
+
+def test_get_message_cache_follows_args():
+    record = make_record('a=%s', 1)
+    record.getMessage()
+    record.args = (2,)
+    assert record.getMessage() == 'a="2"'
+
+
+def test_logger_make_record():
+    logger = TLoggerLogger('name')
+    record = logger.makeRecord('name', logging.INFO, __file__, 1, 'a=%s',
+                               (1,), None, extra={'spam': 'eggs'})
+    assert isinstance(record, TLoggerLogRecord)
+    assert record.spam == 'eggs'
+
+
+@pytest.mark.parametrize('value', [1, 'plain', 'new\nline', 'caf\xe9'])
+def test_quote_argument(value):
+    from tlogger.serializers import quote_argument
+    assert quote_argument(value) == '"{}"'.format(legacy_escape(value))
+
+
+def timed_record(created):
+    record = make_record('message')
+    record.created = created
+    record.msecs = (created - int(created)) * 1000
+    return record
+
+
+def test_formatter_pads_milliseconds():
+    formatter = TLoggerFormatter()
+    record = timed_record(1461582000.005)
+    assert formatter.format(record) == \
+        'ts=2016-04-25T11:00:00.005Z level=INFO message'
+
+
+def test_formatter_microseconds():
+    formatter = TLoggerFormatter(timespec='microseconds')
+    assert formatter.formatTime(timed_record(1461582000.0000125),
+                                formatter.DATEFMT) == \
+        '2016-04-25T11:00:00.000012'
+
+
+def test_formatter_custom_format_keeps_seconds():
+    formatter = TLoggerFormatter('%(asctime)s.%(msecs)03dZ')
+    assert formatter.format(timed_record(1461582000.25)) == \
+        '2016-04-25T11:00:00.250Z'
+
+
+def test_formatter_caches_second_prefix():
+    formatter = TLoggerFormatter()
+    formatter.formatTime(timed_record(1461582000.1), formatter.DATEFMT)
+
+    with mock.patch('time.strftime') as strftime:
+        result = formatter.formatTime(timed_record(1461582000.2),
+                                      formatter.DATEFMT)
+
+    assert strftime.call_count == 0
+    assert result == '2016-04-25T11:00:00.200'
+
+
+def test_formatter_unknown_timespec():
+    with pytest.raises(ValueError):
+        TLoggerFormatter(timespec='hours')
@@ -0,0 +1,77 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import functools
+import inspect
+
+import pytest
+
+from tlogger.call_args import make_call_args_binder
+
+
+def positional(a, b, c=3):
+    pass
+
+
+def variadic(a, *args, **kwargs):
+    pass
+
+
+class Klass(object):
+    def method(self, a, b=2):
+        pass
+
+    @classmethod
+    def class_method(cls, a):
+        pass
+
+
+def inject_user(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func('user', *args, **kwargs)
+    return wrapper
+
+
+@inject_user
+def injects_user(user, x):
+    pass
+
+
+@pytest.mark.parametrize('func, args, kwargs', [
+    (positional, (1, 2, 3), {}),
+    (positional, (1, 2), {}),
+    (positional, (1,), {'b': 2}),
+    (positional, (), {'a': 1, 'b': 2, 'c': 4}),
+    (variadic, (1,), {}),
+    (variadic, (1, 2, 3), {'x': 4}),
+    (Klass().method, (1,), {}),
+    (Klass().method, (1, 2), {}),
+    (Klass.class_method, (1,), {}),
+    (injects_user, (5,), {}),
+])
+def test_binder_matches_getcallargs(func, args, kwargs):
+    binder = make_call_args_binder(func)
+    assert binder(*args, **kwargs) == inspect.getcallargs(func, *args, **kwargs)
+
+
+@pytest.mark.parametrize('args, kwargs', [
+    ((), {}),
+    ((1, 2, 3, 4), {}),
+    ((1, 2), {'d': 4}),
+])
+def test_binder_raises_on_wrong_arguments(args, kwargs):
+    binder = make_call_args_binder(positional)
+    with pytest.raises(TypeError):
+        binder(*args, **kwargs)
+
+
+def test_binder_error_names_function():
+    binder = make_call_args_binder(positional)
+    with pytest.raises(TypeError) as excinfo:
+        binder(b=2)
+    assert 'positional()' in str(excinfo.value)
@@ -0,0 +1,102 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pickle
+
+import mock
+
+from tlogger.action_stack import ActionStack
+from tlogger.actions import Action
+from tlogger.context import (ActionToken, ResumedContext, capture_context,
+                             resume_context)
+
+
+def test_capture_context_without_action():
+    assert capture_context(ActionStack()) is None
+
+
+def test_capture_context():
+    stack = ActionStack()
+    root = Action('root', mock.Mock(), uid='root-guid', uid_field_name='guid',
+                  action_stack=stack, context_object=test_capture_context)
+    child = Action('child', mock.Mock(), action_stack=stack,
+                   context_object=test_capture_context)
+    stack.push(root)
+    stack.push(child)
+
+    token = capture_context(stack)
+    assert token == ActionToken('guid', 'root-guid', True, None, None)
+    assert pickle.loads(pickle.dumps(token)) == token
+
+
+def test_resume_context():
+    stack = ActionStack()
+    token = ActionToken('guid', 'root-guid', False, None, None)
+
+    with resume_context(token, stack):
+        assert isinstance(stack.peek(), ResumedContext)
+        action = Action('name', mock.Mock(), action_stack=stack,
+                        context_object=test_resume_context)
+        action.start()
+        assert action._event_context('event')['guid'] == 'root-guid'
+        assert not action.sampled
+        assert capture_context(stack) == token
+        action.finish()
+
+    assert stack.peek() is None
+
+
+def test_resume_context_none():
+    stack = ActionStack()
+    with resume_context(None, stack):
+        assert stack.peek() is None
+
+
+def test_logger_events_within_resumed_context():
+    from tlogger.action_stack import action_stack
+    from tlogger.logger import Logger
+
+    logger = mock.Mock()
+    logger.name = 'app'
+    tlogger = Logger(logger)
+    token = ActionToken('guid', 'root-guid', True, None, None)
+
+    with resume_context(token):
+        assert tlogger.get_current_action() is None
+        tlogger.info('message')
+
+    assert 'root-guid' in logger.log.call_args[0]
+    assert action_stack.peek() is None
+
+
+def test_resumed_span_parent():
+    from tlogger.tracing import SpanExporter
+
+    sink = mock.Mock()
+    exporter = SpanExporter(sink, interval=None)
+    action_class = type(str('TracedAction'), (Action,),
+                        {'span_exporter': exporter})
+    stack = ActionStack()
+
+    parent = action_class('parent', mock.Mock(), action_stack=stack,
+                          context_object=test_resumed_span_parent)
+    parent.start()
+    token = capture_context(stack)
+    parent.finish()
+
+    other_stack = ActionStack()
+    with resume_context(token, other_stack):
+        child = action_class('child', mock.Mock(), action_stack=other_stack,
+                             context_object=test_resumed_span_parent)
+        child.start()
+        child.finish()
+    exporter.flush()
+
+    spans = sink.call_args[0][0]['resourceSpans'][0]['scopeSpans'][0]['spans']
+    parent_span, child_span = spans
+    assert child_span['traceId'] == parent_span['traceId']
+    assert child_span['parentSpanId'] == parent_span['spanId']
@@ -5,8 +5,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import functools
+
 import mock
+import pytest
 
+from tlogger.actions import Action
 from tlogger.decorators import wrap_function
 
 
@@ -47,3 +51,131 @@ def test_activates_action_context(function):
     action = action_class.return_value
     action.__enter__.assert_called_once_with()
     action.__exit__.assert_called_once_with(None, None, None)
+
+
+class CustomAction(Action):
+    def __init__(self, name, logger, context_object=None):
+        super(CustomAction, self).__init__(name, logger,
+                                           context_object=context_object)
+
+
+def test_custom_constructor_gets_its_arguments_only(function):
+    logger = mock.Mock()
+    wrapped = wrap_function(function, CustomAction, logger)
+    assert wrapped(1) == 1
+    assert logger.log.call_count == 2
+
+
+def test_custom_constructor_compiles_param_filter(function):
+    class FilteredAction(Action):
+        def __init__(self, name, logger, context_object=None,
+                     hide_params=None):
+            super(FilteredAction, self).__init__(
+                name, logger, context_object=context_object,
+                hide_params=hide_params)
+
+    logger = mock.Mock()
+    wrapped = wrap_function(function, FilteredAction, logger,
+                            hide_params=['result'])
+    assert wrapped(1) == 1
+
+    finish_args = logger.log.call_args[0]
+    assert 'result=' not in finish_args[1]
+
+
+def test_full_name_computed_at_decoration_time(function):
+    with mock.patch.object(CustomAction, 'build_full_name',
+                           wraps=Action.build_full_name) as build_full_name:
+        wrapped = wrap_function(function, CustomAction, mock.Mock())
+        build_full_name.assert_called_once_with(None, function)
+
+        wrapped(1)
+        wrapped(2)
+
+    # Events of both calls are named without computing it again
+    assert build_full_name.call_count == 1
+
+
+def test_descriptor_plain_function_wrapped_once(function):
+    from tlogger.decorators import wrap_descriptor_method
+
+    action_class = mock.MagicMock()
+    wrapped = wrap_descriptor_method(function, action_class, mock.Mock())
+
+    assert wrapped.__wrapped__ is function
+    assert wrapped(1) == 1
+
+
+def test_descriptor_methods_bind_natively():
+    from tlogger.decorators import wrap_descriptor_method
+
+    action_class = mock.MagicMock()
+    logger = mock.Mock()
+
+    class Klass(object):
+        def method(self, arg):
+            return self, arg
+
+        @classmethod
+        def class_method(cls, arg):
+            return cls, arg
+
+        @staticmethod
+        def static_method(arg):
+            return arg
+
+    Klass.method = wrap_descriptor_method(Klass.__dict__['method'],
+                                          action_class, logger)
+    Klass.class_method = wrap_descriptor_method(
+        Klass.__dict__['class_method'], action_class, logger)
+    Klass.static_method = wrap_descriptor_method(
+        Klass.__dict__['static_method'], action_class, logger)
+
+    instance = Klass()
+    assert instance.method(1) == (instance, 1)
+    assert Klass.class_method(2) == (Klass, 2)
+    assert instance.class_method(2) == (Klass, 2)
+    assert Klass.static_method(3) == 3
+    assert instance.static_method is Klass.static_method
+    assert instance.class_method.__func__ is Klass.class_method.__func__
+
+
+def test_descriptor_proxy_caches_wrappers():
+    from tlogger.decorators import DescriptorProxy
+
+    class Descriptor(object):
+        def __get__(self, instance, owner):
+            return function
+
+    def function():
+        return 42
+
+    proxy = DescriptorProxy(Descriptor(), mock.MagicMock(), mock.Mock())
+
+    assert proxy.__get__(None, object)() == 42
+    assert proxy.__get__(None, object) is proxy.__get__(None, object)
+
+
+@pytest.mark.skipif(not hasattr(functools, 'partialmethod'),
+                    reason='functools.partialmethod is not available')
+def test_descriptor_proxy_does_not_cache_fresh_callables():
+    import gc
+    from tlogger.actions import Action
+    from tlogger.decorators import DescriptorProxy
+
+    class Klass(object):
+        def method(self, a, b):
+            return a + b
+
+        # Mock action class would keep references to called functions
+        add_one = DescriptorProxy(functools.partialmethod(method, 1),
+                                  Action, mock.Mock())
+
+    instance = Klass()
+    for i in range(100):
+        assert instance.add_one(i) == i + 1
+    gc.collect()
+
+    proxy = Klass.__dict__['add_one']
+    assert len(proxy._wrapped) == 0
+    assert len(proxy._seen) == 0
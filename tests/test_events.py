@@ -35,3 +35,22 @@ def test_event_items_manual_before_random():
     e = Event(payload=payload)
 
     assert [k for k, v in e.items()] == ['id', 'a', 'b', 'c', 'raw']
+
+
+def test_event_template_is_shared_by_payload_shape():
+    first = Event({'a': 1, 'id': 2})
+    second = Event({'id': 3, 'a': 4})
+
+    assert first.template is second.template
+    assert first.template.fields == ('id', 'a')
+
+
+def test_event_template_uses_field_formatters():
+    class FormattedEvent(Event):
+        def format_a(self, value):
+            return value * 2
+
+    e = FormattedEvent({'a': 1, 'b': 1})
+
+    assert list(e.items()) == [('a', 2), ('b', 1)]
+    assert e.template is not Event.get_template(['a', 'b'])
@@ -0,0 +1,62 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import mock
+import pytest
+
+from tlogger import executor
+from tlogger.action_stack import action_stack
+from tlogger.actions import Action
+from tlogger.context import ActionToken, capture_context
+
+futures = pytest.importorskip('concurrent.futures')
+
+
+def current_token(*args):
+    return capture_context(), args
+
+
+@pytest.fixture
+def action():
+    action = Action('request', mock.Mock(), uid='request-guid',
+                    uid_field_name='guid', context_object=current_token)
+    with action:
+        yield action
+
+
+def test_wrap_without_action():
+    assert executor.wrap(current_token)() == (None, ())
+
+
+def test_submit_to_thread_pool(action):
+    with futures.ThreadPoolExecutor(2) as pool:
+        token, args = executor.submit(pool, current_token, 1).result()
+        tokens = [token for token, _ in
+                  executor.map(pool, current_token, [1, 2, 3])]
+
+    assert token.uid == 'request-guid'
+    assert args == (1,)
+    assert [token.uid for token in tokens] == ['request-guid'] * 3
+
+
+def test_submit_to_process_pool(action):
+    with futures.ProcessPoolExecutor(1) as pool:
+        token, args = executor.submit(pool, current_token, 1).result()
+
+    assert token.uid == 'request-guid'
+
+
+def test_process_pool_initializer():
+    token = ActionToken('guid', 'pool-guid', True, None, None)
+    initializer = mock.Mock()
+    action_stack.push(mock.Mock())
+    try:
+        executor.process_pool_initializer(token, initializer, (1,))
+        assert capture_context() == token
+        initializer.assert_called_once_with(1)
+    finally:
+        action_stack.clear()
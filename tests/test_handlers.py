@@ -0,0 +1,120 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import logging
+import time
+
+import mock
+import pytest
+
+from tlogger import handlers
+from tlogger.handlers import BatchFileHandler
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('batch.log'))
+
+
+@pytest.fixture
+def make_handler(path):
+    created = []
+
+    def make_handler(**kwargs):
+        kwargs.setdefault('max_age', None)
+        handler = BatchFileHandler(path, **kwargs)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        created.append(handler)
+        return handler
+
+    yield make_handler
+
+    for handler in created:
+        handler.close()
+
+
+def read(path):
+    with io.open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def record(msg, level=logging.INFO):
+    return logging.LogRecord('test', level, __file__, 1, msg, (), None)
+
+
+def test_buffers_until_flush(make_handler, path):
+    handler = make_handler()
+    handler.handle(record('one'))
+    handler.handle(record('two'))
+    assert read(path) == ''
+
+    handler.flush()
+    assert read(path) == 'one\ntwo\n'
+
+
+def test_writes_at_max_records(make_handler, path):
+    handler = make_handler(max_records=2)
+    handler.handle(record('one'))
+    assert read(path) == ''
+    handler.handle(record('two'))
+    assert read(path) == 'one\ntwo\n'
+
+
+def test_writes_at_capacity_with_single_syscall(make_handler, path):
+    handler = make_handler(capacity=8)
+    handler.handle(record('one'))
+
+    with mock.patch.object(handlers, '_write_all',
+                           wraps=handlers._write_all) as write_all:
+        handler.handle(record('two three'))
+
+    assert write_all.call_count == 1
+    assert read(path) == 'one\ntwo three\n'
+
+
+def test_writes_on_flush_level(make_handler, path):
+    handler = make_handler()
+    handler.handle(record('one'))
+    handler.handle(record('boom', logging.ERROR))
+    assert read(path) == 'one\nboom\n'
+
+
+def test_writes_aged_on_emit(make_handler, path):
+    handler = make_handler(max_age=60)
+    handler.handle(record('one'))
+    handler._since -= 60
+    handler.handle(record('two'))
+    assert read(path) == 'one\ntwo\n'
+
+
+def test_writes_aged_in_background(make_handler, path):
+    handler = make_handler(max_age=0.01)
+    handler.handle(record('one'))
+
+    for _ in range(100):
+        if read(path):
+            break
+        time.sleep(0.01)
+    assert read(path) == 'one\n'
+
+
+def test_close_writes_buffer(make_handler, path):
+    handler = make_handler()
+    handler.handle(record('ünïcode'))
+    handler.close()
+    assert read(path) == 'ünïcode\n'
+    handler.close()
+
+
+def test_write_all_handles_partial_writes():
+    with mock.patch.object(handlers, '_writev', return_value=2), \
+            mock.patch('os.write', side_effect=[1, 2]) as write:
+        handlers._write_all(3, [b'abc', b'de'])
+
+    assert [bytes(call[0][1]) for call in write.call_args_list] == \
+        [b'cde', b'de']
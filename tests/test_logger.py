@@ -187,3 +187,70 @@ def test__get_logger__returns_logger():
     name = 'logger.name'
     logger = get_logger(name)
     assert logger.logger == name
+
+
+def test__logger__raw__skipped_when_level_disabled(tlogger, logger):
+    logger.isEnabledFor.return_value = False
+    with mock.patch.object(tlogger, 'event') as event:
+        tlogger.debug('Aaaa!')
+
+    logger.isEnabledFor.assert_called_once_with(Level.debug.value)
+    assert event.call_count == 0
+
+
+def test__logger__raw__emitted_by_current_action_logger():
+    import logging
+    from tlogger.logger import Logger
+
+    action_logger = mock.Mock()
+    action_logger.isEnabledFor.return_value = True
+    quiet = logging.getLogger('tlogger.tests.quiet')
+    quiet.setLevel(logging.ERROR)
+    a, b = Logger(action_logger), Logger(quiet)
+
+    @a
+    def function():
+        b.info('inside')
+
+    function()
+
+    assert any(call[0][0] == Level.info.value and
+               'raw="inside"' in call[0][1]
+               for call in action_logger.log.call_args_list)
+
+
+def test__logger__create_ad_hoc_action__named_after_logger():
+    from tlogger.logger import Logger
+
+    action = Logger('app.module').create_ad_hoc_action()
+    assert action._get_full_name() == 'app.module.ad_hoc_action'
+
+
+def test__logger__serializer_class(logger):
+    from tlogger.logger import Logger
+    from tlogger.serializers import JSONSerializer, StructuredMessage
+
+    tlogger = Logger(logger, serializer_class=JSONSerializer)
+    assert tlogger.action_class.serializer_class is JSONSerializer
+
+    action = tlogger.start_action(
+        'name', context_object=test__logger__serializer_class)
+    action.emit_event('event', payload={'spam': 'eggs'})
+
+    msg = logger.log.call_args[0][1]
+    assert isinstance(msg, StructuredMessage)
+    assert msg.fields['spam'] == 'eggs'
+
+
+def test__logger__actions_share_resolved_logger():
+    import logging
+    from tlogger.logger import Logger
+
+    tlogger = Logger('tlogger.tests.named')
+    action = tlogger.start_action(
+        'name', context_object=test__logger__actions_share_resolved_logger)
+
+    assert action.logger is tlogger.create_ad_hoc_action().logger
+    assert action.get_logger() is tlogger.get_logger() is \
+        logging.getLogger('tlogger.tests.named')
+    assert tlogger.name == 'tlogger.tests.named'
@@ -0,0 +1,167 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import gc
+import re
+import threading
+
+import mock
+import pytest
+
+from tlogger.metrics import (ActionStats, BUCKET_COUNT, Metrics, bucket_bounds,
+                             bucket_index)
+
+
+@pytest.mark.parametrize('value', [0, 1, 31, 32, 33, 100, 1000, 12345,
+                                   10 ** 6, 10 ** 9])
+def test_bucket_bounds(value):
+    lowest, highest = bucket_bounds(bucket_index(value))
+    assert lowest <= value <= highest
+    assert highest - lowest <= value / 16
+
+
+def test_bucket_index_clamped():
+    assert bucket_index(2 ** 60) == BUCKET_COUNT - 1
+
+
+def test_action_stats():
+    stats = ActionStats()
+    for ms in range(1, 101):
+        stats.add(ms * 1000000, status_code=200 if ms % 10 else 500,
+                  error=not ms % 50)
+    stats.add(None, status_code=200)
+
+    assert stats.count == 101
+    assert stats.errors == 2
+    assert stats.statuses == {200: 91, 500: 10}
+    assert stats.mean() == 50.5
+    assert 49 <= stats.percentile(0.5) <= 52
+    assert 98 <= stats.percentile(0.99) <= 104
+    assert 100 <= stats.percentile(1.0) <= 104
+
+
+def test_action_stats_merge():
+    first, second = ActionStats(), ActionStats()
+    first.add(1000, 0)
+    second.add(2000, 1, error=True)
+
+    merged = first.copy()
+    merged.merge(second)
+    assert (merged.count, merged.errors, merged.statuses) == (2, 1, {0: 1, 1: 1})
+
+    merged.merge(first, sign=-1)
+    assert (merged.count, merged.statuses) == (1, {1: 1})
+    assert list(merged.histogram) == list(second.histogram)
+
+
+def test_snapshot_merges_threads():
+    metrics = Metrics()
+
+    def record():
+        for _ in range(100):
+            metrics.record('action', 1000)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.record('other')
+
+    snapshot = metrics.snapshot()
+    assert snapshot['action'].count == 400
+    assert snapshot['other'].count == 1
+    assert snapshot['other'].timed == 0
+
+
+def test_shards_of_finished_threads_are_retired():
+    metrics = Metrics()
+
+    for _ in range(50):
+        thread = threading.Thread(target=metrics.record, args=('action',))
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert len(metrics._shards) <= 1
+    assert metrics.snapshot()['action'].count == 50
+
+    metrics.record('action')
+    assert metrics.snapshot()['action'].count == 51
+
+
+def logged_fields(logger):
+    args = logger.log.call_args[0]
+    return dict(zip(re.findall(r'(\w+)=%s', args[1]), args[2:]))
+
+
+def test_emit_summary_per_interval():
+    logger = mock.Mock()
+    metrics = Metrics(logger=logger)
+    metrics.record('spam', 2000000)
+    metrics.record('eggs', 1000000, error=True)
+
+    metrics.emit_summary()
+    assert logger.log.call_count == 2
+    assert logged_fields(logger)['event'] == 'spam.summary'
+
+    metrics.record('spam', 2000000)
+    metrics.emit_summary()
+    assert logger.log.call_count == 3
+
+    fields = logged_fields(logger)
+    assert fields['count'] == 1
+    assert fields['errors'] == 0
+    assert fields['status_codes'] == {0: 1}
+    assert fields['duration_ms_mean'] == 2.0
+    assert 2.0 <= fields['duration_ms_p99'] <= 2.1
+
+
+def test_reporter_thread():
+    logger = mock.Mock()
+    metrics = Metrics(interval=60, logger=logger)
+    metrics.record('spam', 1000)
+
+    metrics.stop()
+    assert logger.log.call_count == 1
+
+
+def test_logger_metrics_mode():
+    from tlogger.logger import Logger
+
+    logger = mock.Mock()
+    metrics = Metrics(logger=mock.Mock())
+    tlogger = Logger(logger, metrics=metrics)
+    assert tlogger.metrics is metrics
+
+    @tlogger
+    def function(fail=False):
+        if fail:
+            raise ValueError(fail)
+
+    function()
+    function()
+    with pytest.raises(ValueError):
+        function(fail=True)
+
+    stats = metrics.snapshot()[tlogger.action_class.build_full_name(
+        None, function)]
+    assert (stats.count, stats.errors, stats.timed) == (3, 1, 3)
+
+    # Only the error is logged, with call params missing from start event
+    assert logger.log.call_count == 1
+    assert 'call_params=%s' in logger.log.call_args[0][1]
+
+
+def test_logger_metrics_mode_with_events():
+    from tlogger.logger import Logger
+
+    logger = mock.Mock()
+    tlogger = Logger(logger, metrics=Metrics(log_events=True))
+
+    tlogger(lambda: None)()
+    assert logger.log.call_count == 2
@@ -9,6 +9,7 @@ import mock
 import pytest
 
 from tlogger.action_binder import ActionBinder
+from tlogger.action_stack import ActionStackWarning
 
 
 @pytest.fixture
@@ -54,3 +55,120 @@ def test__process_response__wo_action(http_request, action_middleware):
     response = mock.Mock()
     result = action_middleware.process_response(http_request, response)
     assert result is response
+
+
+@pytest.fixture
+def logger():
+    return mock.Mock()
+
+
+@pytest.fixture
+def middleware_class(logger):
+    from tlogger.django.middleware import RequestActionMiddleware
+
+    return type(str('Middleware'), (RequestActionMiddleware,),
+                {'logger': logger})
+
+
+def logged_events(logger):
+    events = []
+    for call in logger.log.call_args_list:
+        args = call[0]
+        fields = dict(zip(
+            [part.split('=')[0] for part in args[1].split()], args[2:]))
+        events.append(fields)
+    return events
+
+
+def make_request():
+    from django.test import RequestFactory
+    return RequestFactory().get('/', HTTP_REQUEST_ID='deadbeef')
+
+
+def test__request_middleware__finishes_with_status(middleware_class, logger):
+    from django.http import HttpResponse
+
+    request = make_request()
+    response = HttpResponse(status=201)
+    middleware = middleware_class(lambda request: response)
+
+    assert middleware(request) is response
+    assert ActionBinder.get_action(request) is None
+
+    start, finish = logged_events(logger)
+    assert start['guid'] == finish['guid'] == 'deadbeef'
+    assert finish['event'].endswith('Middleware.request.finish')
+    assert finish['status_code'] == 201
+    assert finish['status_msg'] == 'Created'
+    assert finish['duration_ms'] >= 0
+
+
+def test__request_middleware__binds_action(middleware_class):
+    from django.http import HttpResponse
+
+    def get_response(request):
+        assert ActionBinder.get_action(request) is not None
+        return HttpResponse()
+
+    middleware_class(get_response)(make_request())
+
+
+def test__request_middleware__fails_on_exception(middleware_class, logger):
+    request = make_request()
+    middleware = middleware_class(mock.Mock(side_effect=ValueError('boom')))
+
+    with pytest.raises(ValueError):
+        middleware(request)
+
+    error = logged_events(logger)[-1]
+    assert error['event'].endswith('.error')
+    assert error['status_code'] == 500
+    assert isinstance(error['exc_val'], ValueError)
+
+
+def test__request_middleware__fails_on_handled_exception(middleware_class,
+                                                         logger):
+    from django.http import HttpResponseServerError
+
+    def get_response(request):
+        try:
+            raise ValueError('boom')
+        except ValueError as e:
+            assert middleware.process_exception(request, e) is None
+        return HttpResponseServerError()
+
+    middleware = middleware_class(get_response)
+    middleware(make_request())
+
+    error = logged_events(logger)[-1]
+    assert error['event'].endswith('.error')
+    assert error['status_code'] == 500
+    assert isinstance(error['exc_val'], ValueError)
+
+
+def test__request_middleware__isolates_context(middleware_class):
+    from django.http import HttpResponse
+    from tlogger.action_stack import action_stack
+
+    def get_response(request):
+        action_stack.push(mock.Mock())  # leaked by a view
+        return HttpResponse()
+
+    middleware = middleware_class(get_response)
+    with pytest.warns(ActionStackWarning):  # request action is not on top
+        middleware(make_request())
+
+    assert action_stack.peek() is None
+
+
+def test__request_middleware__reads_settings_once():
+    from django.test import override_settings
+    from tlogger.django.middleware import RequestActionMiddleware
+
+    with override_settings(TLOGGER_REQUEST_ACTION_NAME='http'):
+        middleware = RequestActionMiddleware(mock.Mock())
+    assert middleware.action_name == 'http'
+    assert middleware.header == 'HTTP_REQUEST_ID'
+    assert middleware.logger.name == 'tlogger.request'
+    assert RequestActionMiddleware.sync_capable
+    assert RequestActionMiddleware.async_capable
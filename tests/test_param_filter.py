@@ -0,0 +1,96 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import mock
+
+from tlogger.param_filter import CLEANSE, DESCEND, HIDE, KEEP, ParamFilter
+
+
+PARAMS = {
+    'result': 42,
+    'extra': 'x',
+    'call_params': {
+        'user': {'name': 'alice', 'password': 'secret'},
+        'password': 'secret',
+        'api_token': 'token',
+        'page': 2,
+    },
+}
+
+
+def test_plain_names():
+    param_filter = ParamFilter(hide_params=['result', 'page'],
+                               sensitive_params=['password', 'extra'])
+    assert param_filter.filter(PARAMS) == {
+        'extra': 'x',
+        'call_params': {
+            'user': {'name': 'alice', 'password': 'secret'},
+            'password': '******',
+            'api_token': 'token',
+        },
+    }
+
+
+def test_nested_paths():
+    param_filter = ParamFilter(
+        hide_params=['call_params.user.name'],
+        sensitive_params=['call_params.user.password'],
+    )
+    result = param_filter.filter(PARAMS)
+    assert result['call_params']['user'] == {'password': '******'}
+    assert result['call_params']['password'] == 'secret'
+
+
+def test_globs():
+    param_filter = ParamFilter(hide_params=['*_token'],
+                               sensitive_params=['call_params.*.password'])
+    result = param_filter.filter(PARAMS)
+    assert 'api_token' not in result['call_params']
+    assert result['call_params']['user']['password'] == '******'
+    assert result['call_params']['password'] == 'secret'
+
+
+def test_dispositions_memoized():
+    param_filter = ParamFilter(hide_params=['result'])
+    assert param_filter.disposition('result') is HIDE
+    assert param_filter.disposition('call_params') is DESCEND
+    assert param_filter.disposition('page', 'call_params') is KEEP
+
+    with mock.patch.object(param_filter, '_hide') as rules:
+        assert param_filter.disposition('result') is HIDE
+    assert rules.matches.call_count == 0
+
+
+def test_dispositions_memo_is_bounded():
+    param_filter = ParamFilter(sensitive_params=['call_params.*.password'])
+    param_filter.max_dispositions = 100
+
+    for i in range(1000):
+        body = {'key%d' % i: {'password': 'secret', 'name': i}}
+        assert param_filter.filter({'call_params': body}) == {
+            'call_params': {'key%d' % i: {'password': '******', 'name': i}}}
+
+    assert sum(len(names)
+               for names in param_filter._dispositions.values()) <= 100
+
+
+def test_sensitive_plain_names_only_in_call_params():
+    param_filter = ParamFilter(sensitive_params=['result'])
+    assert param_filter.disposition('result') is KEEP
+    assert param_filter.disposition('result', 'call_params') is CLEANSE
+
+
+def test_filter_into_target_with_render():
+    target = {'event': 'name'}
+    ParamFilter().filter({'call_params': {'a': 1}, 'b': 2}, target=target,
+                         render=lambda value: value * 10)
+    assert target == {'event': 'name', 'call_params': {'a': 10}, 'b': 20}
+
+
+def test_compile_shared():
+    assert ParamFilter.compile(['a'], ['b']) is ParamFilter.compile(['a'], ['b'])
+    assert ParamFilter.compile(['a']) is not ParamFilter.compile(['b'])
@@ -0,0 +1,169 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+import mock
+import pytest
+
+from tlogger.action_stack import ActionStack
+from tlogger.actions import Action
+from tlogger.constants import Level
+from tlogger import pipeline as module
+
+
+class PipelineAction(Action):
+    pass
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = module.install(PipelineAction)
+    yield pipeline
+    module.uninstall(PipelineAction)
+
+
+@pytest.fixture
+def logger():
+    return mock.Mock()
+
+
+@pytest.fixture
+def action(request, logger):
+    return PipelineAction('action_name', logger, action_stack=ActionStack(),
+                          context_object=request.function)
+
+
+def test_install_sets_class_pipeline(pipeline):
+    assert PipelineAction.pipeline is pipeline
+    assert Action.pipeline is None
+
+
+def test_uninstall_resets_class_pipeline(pipeline):
+    module.uninstall(PipelineAction)
+    assert PipelineAction.pipeline is None
+
+
+def test_events_written_in_background(pipeline, action, logger):
+    threads = []
+    logger.log.side_effect = lambda *args: threads.append(
+        threading.current_thread())
+
+    action.emit_event('event', payload={'spam': 'eggs'})
+    pipeline.flush()
+
+    assert logger.log.call_count == 1
+    assert logger.log.call_args[0][0] == Level.info.value
+    assert 'spam=%s' in logger.log.call_args[0][1]
+    assert threads[0] is not threading.current_thread()
+
+
+def test_exc_info_captured_in_emitting_thread(pipeline, action, logger):
+    try:
+        raise ValueError('Bang!')
+    except ValueError:
+        action.emit_event('event', trace_exception=True)
+    pipeline.flush()
+
+    exc_info = logger.log.call_args[1]['exc_info']
+    assert exc_info[0] is ValueError
+
+
+def test_records_stamped_in_emitting_thread(pipeline, request):
+    import logging
+    import time
+
+    records = []
+
+    class SlowHandler(logging.Handler):
+        def emit(self, record):
+            time.sleep(0.05)
+            records.append(record)
+
+    logger = logging.getLogger('tlogger.tests.pipeline')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = SlowHandler()
+    logger.addHandler(handler)
+    try:
+        action = PipelineAction('action_name', logger,
+                                action_stack=ActionStack(),
+                                context_object=request.function)
+        emitted = time.time()
+        for _ in range(3):
+            action.emit_event('event')
+        pipeline.flush()
+    finally:
+        logger.removeHandler(handler)
+
+    assert len(records) == 3
+    for record in records:
+        assert record.created - emitted < 0.05
+        assert record.thread == threading.current_thread().ident
+        assert record.threadName == threading.current_thread().name
+
+
+def _blocked_pipeline(**kwargs):
+    pipeline = module.EmissionPipeline(maxsize=2, **kwargs)
+    for item in range(2):
+        pipeline.put(item)
+    return pipeline
+
+
+def test_drop_newest():
+    pipeline = _blocked_pipeline(policy=module.DROP_NEWEST)
+    pipeline.put(2)
+
+    assert pipeline.dropped == 1
+    assert list(pipeline._queue.queue) == [0, 1]
+
+
+def test_drop_oldest():
+    pipeline = _blocked_pipeline(policy=module.DROP_OLDEST)
+    pipeline.put(2)
+
+    assert pipeline.dropped == 1
+    assert list(pipeline._queue.queue) == [1, 2]
+
+
+def test_block_with_timeout():
+    pipeline = _blocked_pipeline(policy=module.BLOCK, timeout=0.01)
+    pipeline.put(2)
+
+    assert pipeline.dropped == 1
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        module.EmissionPipeline(policy='spam')
+
+
+def test_events_after_stop_written_inline(action, logger):
+    pipeline = module.install(PipelineAction, maxsize=1)
+    pipeline.stop()  # like at exit, still installed
+    try:
+        for _ in range(3):  # would block forever if queued
+            action.emit_event('event')
+    finally:
+        module.uninstall(PipelineAction)
+
+    assert logger.log.call_count == 3
+
+
+def test_stop_survives_dropped_wake_up():
+    pipeline = module.EmissionPipeline(maxsize=1, policy=module.DROP_OLDEST)
+    action_class = mock.Mock()
+    pipeline._queue.put(module._STOP)
+    pipeline.put((action_class, mock.Mock(), None))  # drops the wake-up
+    pipeline._stopped.set()
+
+    thread = threading.Thread(target=pipeline._run)
+    thread.start()
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert action_class.write_event.call_count == 1
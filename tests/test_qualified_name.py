@@ -0,0 +1,44 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import mock
+
+from tlogger.qualified_name import find_qualified_name
+
+
+class Klass(object):
+    def method(self):
+        pass
+
+
+def function():
+    pass
+
+
+def test_function():
+    assert find_qualified_name(function) == 'test_qualified_name.function'
+
+
+def test_bound_method():
+    assert find_qualified_name(Klass().method) == \
+        'test_qualified_name.Klass.method'
+
+
+def test_memoized():
+    def local():
+        pass
+
+    with mock.patch('tlogger.qualified_name._find_qualified_name',
+                    return_value='name') as find:
+        assert find_qualified_name(local) == 'name'
+        assert find_qualified_name(local) == 'name'
+
+    assert find.call_count == 1
+
+
+def test_not_weak_referenceable():
+    assert find_qualified_name(42) == '42'
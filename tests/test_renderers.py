@@ -0,0 +1,82 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import mock
+import pytest
+
+from tlogger.renderers import LazyRepr, ParamRenderer
+
+
+@pytest.fixture
+def renderer():
+    return ParamRenderer(max_length=10, max_items=3)
+
+
+@pytest.mark.parametrize('value', [1, 2.5, True, None, 'short'])
+def test_wrap_plain_values(renderer, value):
+    assert renderer.wrap(value) is value
+
+
+@pytest.mark.parametrize('value', ['long string value', [1, 2], object()])
+def test_wrap_lazy(renderer, value):
+    wrapped = renderer.wrap(value)
+    assert isinstance(wrapped, LazyRepr)
+    assert wrapped.value is value
+
+
+def test_render_truncated(renderer):
+    assert renderer.render('x' * 20) == "'xxxxxxxxx..."
+
+
+def test_render_truncates_before_repr(renderer):
+    class Text(type('')):
+        def __repr__(self):
+            raise AssertionError('repr of the whole value')
+
+    assert renderer.render(Text('x' * 10 ** 6)) == "'xxxxxxxxx..."
+    assert renderer.render(b'y' * 10 ** 6) == repr(b'y' * 10)[:10] + '...'
+    assert renderer.render(bytearray(b'z' * 100)).startswith('bytearray(')
+
+
+def test_render_container_summary(renderer):
+    assert renderer.render(list(range(100))) == '<list len=100>'
+
+
+def test_render_small_container(renderer):
+    assert renderer.render([1, 2]) == '[1, 2]'
+
+
+def test_lazy_repr_renders_once(renderer):
+    value = LazyRepr([1], renderer)
+    with mock.patch.object(renderer, 'render', return_value='text') as render:
+        assert str(value) == 'text'
+        assert repr(value) == 'text'
+    assert render.call_count == 1
+
+
+def test_lazy_repr_inside_dict(renderer):
+    assert str({'a': renderer.wrap(list(range(100)))}) == \
+        "{'a': <list len=100>}"
+
+
+def test_action_wraps_params():
+    from tlogger.action_stack import ActionStack
+    from tlogger.actions import Action
+
+    class RenderedAction(Action):
+        param_renderer = ParamRenderer(max_items=3)
+
+    action = RenderedAction('name', mock.Mock(), action_stack=ActionStack(),
+                            context_object=test_action_wraps_params)
+    action.add_params(big=list(range(100)), small=1)
+    action.add_result('x' * 1000)
+
+    context = action._event_context('event', include_params=True,
+                                    include_status=True)
+    assert str(context['call_params']['big']) == '<list len=100>'
+    assert context['call_params']['small'] == 1
+    assert len(str(context['result'])) == 203
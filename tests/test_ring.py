@@ -0,0 +1,134 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+import pytest
+
+from tlogger.handlers import RingFileHandler
+from tlogger.ring import (RingReader, RingWriter, main, make_line_filter,
+                          parse_fields)
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('events.ring'))
+
+
+def write(path, lines, capacity=1024):
+    writer = RingWriter(path, capacity)
+    for line in lines:
+        writer.append(line.encode('utf-8'))
+    writer.close()
+
+
+def read(path):
+    reader = RingReader(path)
+    try:
+        return reader.lines()
+    finally:
+        reader.close()
+
+
+def test_append_and_read(path):
+    write(path, ['one', 'two', 'ünïcode'])
+    assert read(path) == ['one', 'two', 'ünïcode']
+
+
+def test_wraparound_keeps_most_recent(path):
+    lines = ['line %04d' % i for i in range(200)]
+    write(path, lines, capacity=256)
+
+    stored = read(path)
+    assert stored == lines[-len(stored):]
+    assert 10 < len(stored) < 20
+
+
+def test_wrap_overwriting_everything(path):
+    write(path, ['a' * 20, 'b' * 10, 'c' * 45], capacity=64)
+    assert read(path) == ['c' * 45]
+
+
+def test_reopen_keeps_records(path):
+    write(path, ['one'])
+    write(path, ['two'])
+    assert read(path) == ['one', 'two']
+
+
+def test_reopen_with_other_capacity_resets(path):
+    write(path, ['one'])
+    write(path, ['two'], capacity=2048)
+    assert read(path) == ['two']
+
+
+def test_long_line_is_truncated(path):
+    write(path, ['x' * 100], capacity=64)
+    assert read(path) == ['x' * (64 - 12)]
+
+
+def test_reader_rejects_other_files(tmpdir):
+    other = tmpdir.join('other')
+    other.write('x' * 100)
+    with pytest.raises(ValueError):
+        RingReader(str(other))
+
+
+def test_records_from_offset(path):
+    writer = RingWriter(path, 1024)
+    writer.append(b'one')
+    reader = RingReader(path)
+    head = reader.bounds()[1]
+    writer.append(b'two')
+
+    assert [line for _, _, line in reader.records(head)] == ['two']
+    reader.close()
+    writer.close()
+
+
+def test_parse_fields():
+    line = 'ts=2020-01-01T00:00:00.000Z level=INFO event="a.b.start" ' \
+           'guid="de ad" status_code=0'
+    assert parse_fields(line) == {
+        'ts': '2020-01-01T00:00:00.000Z', 'level': 'INFO',
+        'event': 'a.b.start', 'guid': 'de ad', 'status_code': '0',
+    }
+
+
+def test_line_filter():
+    line_filter = make_line_filter(event='app.*.start', guid='beef')
+    assert line_filter('event="app.view.start" guid="beef"')
+    assert line_filter('id="beef" event="app.view.start"')
+    assert not line_filter('event="app.view.finish" guid="beef"')
+    assert not line_filter('event="app.view.start" guid="dead"')
+
+
+def test_cli(path, capsys):
+    write(path, ['event="a.start" guid="1"', 'event="a.finish" guid="1"',
+                 'event="b.start" guid="2"'])
+
+    main(['dump', path, '--guid', '1'])
+    assert capsys.readouterr().out.splitlines() == [
+        'event="a.start" guid="1"', 'event="a.finish" guid="1"']
+
+    main(['tail', path, '-n', '1'])
+    assert capsys.readouterr().out.splitlines() == ['event="b.start" guid="2"']
+
+    main(['dump', path, '--event', '*.start'])
+    assert len(capsys.readouterr().out.splitlines()) == 2
+
+
+def test_handler(path):
+    handler = RingFileHandler(path, capacity=4096)
+    logger = logging.Logger('tlogger.tests.ring')
+    logger.addHandler(handler)
+
+    logger.info('event=%s guid=%s', '"spam.start"', '"beef"')
+    handler.close()
+
+    line, = read(path)
+    assert line.startswith('ts=')
+    assert line.endswith('level=INFO event="spam.start" guid="beef"')
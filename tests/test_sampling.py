@@ -0,0 +1,176 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import mock
+import pytest
+
+from tlogger.action_stack import ActionStack
+from tlogger.actions import Action
+from tlogger.constants import Level
+from tlogger.sampling import Sampler
+
+
+class SampledAction(Action):
+    sampler = Sampler(rate=0.0)
+
+
+@pytest.fixture
+def logger():
+    return mock.Mock()
+
+
+@pytest.fixture
+def action_stack():
+    return ActionStack()
+
+
+def make_action(logger, action_stack, name='action', **kwargs):
+    return SampledAction(name, logger, action_stack=action_stack,
+                         context_object=make_action, **kwargs)
+
+
+def test_sampler_get_rate():
+    sampler = Sampler(rate=0.5, rates={'name': 0.1})
+    assert sampler.get_rate('name') == 0.1
+    assert sampler.get_rate('other', root=True) == 0.5
+    assert sampler.get_rate('other') is None
+
+
+@pytest.mark.parametrize('rate, expected', [
+    (None, True), (1, True), (0, False),
+])
+def test_sampler_sample(rate, expected):
+    assert Sampler.sample(rate) is expected
+
+
+def test_unsampled_root_emits_nothing(logger, action_stack):
+    action = make_action(logger, action_stack)
+
+    with mock.patch.object(action, '_event_context') as event_context:
+        with action:
+            action.emit_event('step')
+
+    assert not action.sampled
+    assert event_context.call_count == 0
+    assert logger.log.call_count == 0
+
+
+def test_nested_action_inherits_decision(logger, action_stack):
+    root = make_action(logger, action_stack)
+    nested = make_action(logger, action_stack, sample_rate=1.0)
+
+    with root:
+        with nested:
+            pass
+
+    assert not nested.sampled
+    assert logger.log.call_count == 0
+
+
+def test_sample_rate_overrides_sampler(logger, action_stack):
+    action = make_action(logger, action_stack, sample_rate=1.0)
+
+    with action:
+        pass
+
+    assert action.sampled
+    assert logger.log.call_count == 2
+
+
+def test_per_name_rate_thins_nested_actions(logger, action_stack):
+    class NamedAction(Action):
+        sampler = Sampler(rate=1.0, rates={'tests.nested': 0.0})
+
+    root = NamedAction('root', logger, action_stack=action_stack,
+                       context_object=make_action)
+    nested = NamedAction('nested', logger, action_stack=action_stack,
+                         context_object=make_action, full_name='tests.nested')
+
+    with root:
+        with nested:
+            pass
+
+    assert root.sampled
+    assert not nested.sampled
+    assert logger.log.call_count == 2
+
+
+def test_fail_always_logged(logger, action_stack):
+    action = make_action(logger, action_stack)
+
+    with pytest.raises(ValueError):
+        with action:
+            raise ValueError('Bang!')
+
+    assert logger.log.call_count == 1
+    assert '.error ' in ' '.join(map(str, logger.log.call_args[0]))
+
+
+def test_fail_not_logged_without_always_on_error(logger, action_stack):
+    class QuietAction(Action):
+        sampler = Sampler(rate=0.0, always_on_error=False)
+
+    action = QuietAction('quiet', logger, action_stack=action_stack,
+                         context_object=make_action)
+
+    with pytest.raises(ValueError):
+        with action:
+            raise ValueError('Bang!')
+
+    assert logger.log.call_count == 0
+
+
+def test_error_level_events_always_logged(logger, action_stack):
+    action = make_action(logger, action_stack)
+
+    with action:
+        action.emit_event('info', level=Level.info)
+        action.emit_event('error', level=Level.error)
+
+    assert logger.log.call_count == 1
+    assert logger.log.call_args[0][0] == Level.error.value
+
+
+def test_decorated_unsampled_call_skips_binding_call_args(logger):
+    from tlogger.decorators import wrap_function
+
+    def function(a):
+        return a
+
+    with mock.patch('tlogger.decorators.make_call_args_binder') as binder:
+        wrapped = wrap_function(function, SampledAction, logger)
+
+    assert wrapped(1) == 1
+    assert binder.return_value.call_count == 0
+    assert logger.log.call_count == 0
+
+
+def test_decorated_unsampled_failure_logged_with_call_args(logger):
+    from tlogger.decorators import wrap_function
+
+    def function(a):
+        raise ValueError('Bang!')
+
+    wrapped = wrap_function(function, SampledAction, logger)
+
+    with pytest.raises(ValueError):
+        wrapped(1)
+
+    assert logger.log.call_count == 1
+    args = logger.log.call_args[0]
+    assert 'call_params=%s' in args[1]
+    assert {'a': 1} in args[2:]
+
+
+def test_presampled_decision_kept_on_start(logger, action_stack):
+    action = make_action(logger, action_stack, sample_rate=1.0)
+    assert action.sample() is True
+
+    with mock.patch.object(SampledAction, '_sample') as sample:
+        action.start()
+    assert sample.call_count == 0
+    assert action.sampled
@@ -5,6 +5,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import pytest
+
 from tlogger.events import Event
 from tlogger.serializers import KeyValueSerializer
 
@@ -31,3 +33,55 @@ def test_arguments_inline():
     event = Event({'foo': 1, 'bar': 2})
     serializer = KeyValueSerializer(event, inline=['bar'])
     assert serializer.arguments() == [1]
+
+
+def test_render():
+    event = Event({'foo': 1, 'raw': 'a "b"'})
+    serializer = KeyValueSerializer(event, inline=['raw'])
+    assert serializer.render() == ('foo=%s raw="a "b""', [1])
+
+
+def test_template_is_cached():
+    first = KeyValueSerializer(Event({'foo': 1}), inline=['raw'])
+    second = KeyValueSerializer(Event({'foo': 2}), inline=['raw'])
+    assert first.template is second.template
+
+
+def test_key_value_log_args():
+    event = Event({'foo': 1, 'raw': 'message %s'})
+    serializer = KeyValueSerializer(event, inline=['raw'])
+    msg, args = serializer.log_args([2])
+    assert msg == 'foo=%s raw="message %s"'
+    assert list(args) == [1, 2]
+
+
+def test_json_log_args():
+    import json
+    from tlogger.serializers import JSONSerializer, StructuredMessage
+
+    event = Event({'foo': 1, 'event': 'name', 'raw': 'message %s'})
+    msg, args = JSONSerializer(event, inline=['raw']).log_args([2])
+
+    assert isinstance(msg, StructuredMessage)
+    assert args == ()
+    assert msg.fields == {'event': 'name', 'foo': 1, 'raw': 'message 2'}
+    assert json.loads(str(msg)) == msg.fields
+    assert list(json.loads(str(msg))) == ['event', 'foo', 'raw']
+
+
+def test_json_non_serializable_values():
+    import json
+    from tlogger.serializers import JSONSerializer
+
+    value = object()
+    msg, _ = JSONSerializer(Event({'foo': value})).log_args()
+    assert json.loads(str(msg)) == {'foo': str(value)}
+
+
+def test_msgpack_encode():
+    msgpack = pytest.importorskip('msgpack')
+    from tlogger.serializers import MsgpackSerializer
+
+    msg, _ = MsgpackSerializer(Event({'foo': 1})).log_args()
+    assert msgpack.unpackb(msg.encode(), raw=False) == {'foo': 1}
+    assert str(msg) == '{"foo":1}'
@@ -0,0 +1,280 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import threading
+import time
+
+import mock
+import pytest
+
+from tlogger.action_stack import ActionStack
+from tlogger.actions import Action
+from tlogger.tracing import (OTLPHTTPSink, OTLPJSONFileSink, SpanExporter,
+                             attributes, trace_id_from_guid)
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+
+@pytest.fixture
+def collector():
+    """Local stand-in of OTLP/HTTP collector receiving JSON requests."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            received.append((self.path, self.headers['Content-Type'],
+                             json.loads(body.decode('utf-8'))))
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    server.received = received
+    server.endpoint = 'http://127.0.0.1:{}/v1/traces'.format(
+        server.server_address[1])
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def make_action_class(exporter):
+    return type(str('TracedAction'), (Action,), {'span_exporter': exporter})
+
+
+def run_trace(action_class, logger, fail=False):
+    stack = ActionStack()
+    root = action_class('request', logger, uid='deadbeef-0000',
+                        uid_field_name='guid', action_stack=stack,
+                        sensitive_params=['password'],
+                        context_object=run_trace)
+    root.add_params(path='/', password='secret')
+    root.start()
+
+    child = action_class('query', logger, action_stack=stack,
+                         context_object=run_trace)
+    child.start()
+    if fail:
+        child.fail(ValueError, ValueError('bad'))
+    else:
+        child.finish()
+
+    root.set_status(200, 'OK')
+    root.finish()
+
+
+def spans_of(request):
+    resource_spans, = request['resourceSpans']
+    scope_spans, = resource_spans['scopeSpans']
+    return scope_spans['spans']
+
+
+def test_trace_id_from_guid():
+    guid = '6ba7b810-9dad-11d1-80b4-00c04fd430c8'
+    assert trace_id_from_guid(guid) == '6ba7b8109dad11d180b400c04fd430c8'
+    assert trace_id_from_guid('deadbeef') == '0' * 24 + 'deadbeef'
+    assert len(trace_id_from_guid('request-1')) == 32
+    assert trace_id_from_guid('request-1') == trace_id_from_guid('request-1')
+
+
+def test_attributes():
+    assert attributes({'a': {'b': 1, 'c': 'x'}, 'd': True, 'e': 1.5}) == [
+        {'key': 'a.b', 'value': {'intValue': '1'}},
+        {'key': 'a.c', 'value': {'stringValue': 'x'}},
+        {'key': 'd', 'value': {'boolValue': True}},
+        {'key': 'e', 'value': {'doubleValue': 1.5}},
+    ]
+
+
+def test_spans_form_trace():
+    sink = mock.Mock()
+    exporter = SpanExporter(sink, service_name='app', interval=None,
+                            log_events=False)
+    logger = mock.Mock()
+
+    run_trace(make_action_class(exporter), logger)
+    assert sink.call_count == 0
+    exporter.flush()
+
+    request, = sink.call_args[0]
+    assert request['resourceSpans'][0]['resource']['attributes'] == [
+        {'key': 'service.name', 'value': {'stringValue': 'app'}}]
+
+    child, root = spans_of(request)
+    assert root['traceId'] == child['traceId'] == trace_id_from_guid(
+        'deadbeef-0000')
+    assert root['parentSpanId'] == ''
+    assert child['parentSpanId'] == root['spanId']
+    assert len(root['spanId']) == 16
+    assert root['name'].endswith('run_trace.request')
+    assert int(root['endTimeUnixNano']) >= int(child['endTimeUnixNano']) >= \
+        int(child['startTimeUnixNano']) >= int(root['startTimeUnixNano'])
+    assert root['status'] == {'code': 0}
+
+    root_attributes = {a['key']: a['value'] for a in root['attributes']}
+    assert root_attributes['call_params.password'] == {
+        'stringValue': Action.CLEANSED_SUBSTITUTE}
+    assert root_attributes['call_params.path'] == {'stringValue': '/'}
+    assert root_attributes['status_code'] == {'intValue': '200'}
+
+    # Only spans are wanted: nothing was formatted or logged
+    assert logger.log.call_count == 0
+
+
+def test_failed_span():
+    sink = mock.Mock()
+    exporter = SpanExporter(sink, interval=None)
+
+    run_trace(make_action_class(exporter), mock.Mock(), fail=True)
+    exporter.flush()
+
+    child = spans_of(sink.call_args[0][0])[0]
+    assert child['status'] == {'code': 2, 'message': 'bad'}
+    event, = child['events']
+    assert event['name'] == 'exception'
+    assert {'key': 'exception.type', 'value': {'stringValue': 'ValueError'}} \
+        in event['attributes']
+
+
+def test_batches_by_size():
+    sink = mock.Mock()
+    exporter = SpanExporter(sink, max_batch=2, interval=None)
+
+    run_trace(make_action_class(exporter), mock.Mock())
+    exporter.stop()
+    assert sink.call_count == 1
+    assert len(spans_of(sink.call_args[0][0])) == 2
+
+
+def test_failing_sink_does_not_break_actions():
+    sink = mock.Mock(side_effect=IOError('collector is down'))
+    exporter = SpanExporter(sink, max_batch=1, interval=None)
+    action_class = make_action_class(exporter)
+    stack = ActionStack()
+
+    with mock.patch('traceback.print_exc') as print_exc:
+        for _ in range(2):
+            action = action_class('name', mock.Mock(), action_stack=stack,
+                                  context_object=run_trace)
+            action.start()
+            action.finish()
+            assert stack.peek() is None
+        exporter.stop()
+
+    assert print_exc.called
+    assert sink.called
+
+    # Spans of failed batches are retried
+    sink.side_effect = None
+    sink.reset_mock()
+    exporter.flush()
+    assert sum(len(spans_of(call[0][0]))
+               for call in sink.call_args_list) == 2
+
+
+def test_failing_sink_backs_off():
+    sink = mock.Mock(side_effect=IOError('collector is down'))
+    exporter = SpanExporter(sink, max_batch=1, interval=0.05)
+
+    with mock.patch('traceback.print_exc') as print_exc:
+        deadline = time.time() + 0.3
+        while time.time() < deadline:
+            exporter.export({'spanId': '1'})
+            time.sleep(0.001)
+        exporter.stop()
+
+    # Attempts after 0.1, 0.2 seconds... and the last one on stop
+    assert 1 <= sink.call_count <= 5
+    assert exporter.sink_errors == sink.call_count
+    assert print_exc.call_count == 1
+
+
+def test_failed_export_pops_action():
+    exporter = mock.Mock(log_events=True)
+    exporter.end_span.side_effect = RuntimeError
+    stack = ActionStack()
+    action = make_action_class(exporter)('name', mock.Mock(),
+                                         action_stack=stack,
+                                         context_object=run_trace)
+    action.start()
+
+    with pytest.raises(RuntimeError):
+        action.finish()
+    assert stack.peek() is None
+
+
+def test_queue_is_bounded():
+    exporter = SpanExporter(mock.Mock(), max_batch=100, interval=None,
+                            max_queue=3)
+    for i in range(5):
+        exporter.export({'spanId': i})
+
+    assert [span['spanId'] for span in exporter._batch] == [2, 3, 4]
+    assert exporter.dropped == 2
+    exporter.stop()
+
+
+def test_unsampled_actions_are_not_exported():
+    sink = mock.Mock()
+    exporter = SpanExporter(sink, interval=None)
+    action_class = make_action_class(exporter)
+    action = action_class('name', mock.Mock(), sample_rate=0.0,
+                          action_stack=ActionStack(),
+                          context_object=test_unsampled_actions_are_not_exported)
+    action.start()
+    action.finish()
+    exporter.flush()
+
+    assert sink.call_count == 0
+
+
+def test_file_sink(tmpdir):
+    path = str(tmpdir.join('spans.json'))
+    exporter = SpanExporter(OTLPJSONFileSink(path), interval=None)
+    action_class = make_action_class(exporter)
+
+    run_trace(action_class, mock.Mock())
+    exporter.flush()
+    run_trace(action_class, mock.Mock())
+    exporter.flush()
+
+    with open(path) as f:
+        requests = [json.loads(line) for line in f]
+    assert [len(spans_of(request)) for request in requests] == [2, 2]
+
+
+def test_http_sink_with_collector(collector):
+    exporter = SpanExporter(OTLPHTTPSink(collector.endpoint), interval=60)
+    run_trace(make_action_class(exporter), mock.Mock())
+    exporter.stop()
+
+    (path, content_type, request), = collector.received
+    assert path == '/v1/traces'
+    assert content_type == 'application/json'
+    assert [span['name'].rsplit('.', 1)[1]
+            for span in spans_of(request)] == ['query', 'request']
+
+
+def test_logger_span_exporter():
+    from tlogger.logger import Logger
+
+    exporter = SpanExporter(mock.Mock(), interval=None)
+    tlogger = Logger(mock.Mock(), span_exporter=exporter)
+    assert tlogger.action_class.span_exporter is exporter
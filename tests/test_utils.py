@@ -0,0 +1,71 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+import mock
+
+from tlogger.utils import (CounterGuidFactory, LoggerRef, create_guid,
+                           create_random_guid, get_logger_ref)
+
+
+def test_create_guid():
+    assert len(create_guid()) == 36
+
+
+def test_create_random_guid():
+    guid = create_random_guid()
+    assert len(guid) == 16
+    assert guid != create_random_guid()
+
+
+def test_counter_guid_factory_sequence():
+    factory = CounterGuidFactory()
+    first, second = factory(), factory()
+
+    assert first != second
+    assert first.split('-')[0] == second.split('-')[0]
+    assert first.endswith('-0')
+    assert second.endswith('-1')
+
+
+def test_counter_guid_factory_resets_after_fork():
+    factory = CounterGuidFactory()
+    first = factory()
+
+    with mock.patch('os.getpid', return_value=-1):
+        second = factory()
+
+    assert first.split('-')[0] != second.split('-')[0]
+    assert second.endswith('-0')
+
+
+def test_logger_ref_resolves_once():
+    ref = LoggerRef('tlogger.tests.ref')
+    with mock.patch('tlogger.utils.getLogger',
+                    side_effect=logging.getLogger) as get_logger:
+        assert ref() is logging.getLogger('tlogger.tests.ref')
+        assert ref() is ref()
+    assert get_logger.call_count == 1
+
+
+def test_logger_ref_resolves_replaced_logger():
+    ref = LoggerRef('tlogger.tests.replaced')
+    old = ref()
+    del logging.Logger.manager.loggerDict['tlogger.tests.replaced']
+
+    new = ref()
+    assert new is not old
+    assert new is logging.getLogger('tlogger.tests.replaced')
+
+
+def test_logger_ref_root():
+    assert LoggerRef(None)() is logging.getLogger()
+
+
+def test_get_logger_ref_shared():
+    assert get_logger_ref('tlogger.tests') is get_logger_ref('tlogger.tests')
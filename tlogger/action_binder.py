@@ -5,6 +5,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from .compat import contextvars
+
 
 class ActionBinder(object):
     attribute_name = '_action'
@@ -31,3 +33,50 @@ class ActionBinder(object):
     @classmethod
     def get_action(cls, func):
         return getattr(func, cls.attribute_name, None)
+
+
+class ContextVarActionBinder(object):
+    """
+    Binds actions to objects in a context variable instead of attributes.
+
+    Concurrent tasks calling the same coroutine function each run in their
+    own context, so they see their own actions and don't unbind each
+    other's. Without :mod:`contextvars` (Python < 3.7) nothing is bound.
+    """
+
+    _bound = None
+    if contextvars is not None:
+        _bound = contextvars.ContextVar('tlogger_bound_actions', default=None)
+
+    def __init__(self, func, action):
+        self.func = func
+        self.action = action
+        self._token = None
+
+    def __enter__(self):
+        self._token = self.bind(self.func, self.action)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unbind(self._token)
+
+    @classmethod
+    def bind(cls, func, action):
+        """Bind `action` to `func`, return token to pass to :meth:`unbind`."""
+        if cls._bound is None:
+            return None
+        bound = dict(cls._bound.get() or ())
+        bound[func] = action
+        return cls._bound.set(bound)
+
+    @classmethod
+    def unbind(cls, token):
+        if token is not None:
+            cls._bound.reset(token)
+
+    @classmethod
+    def get_action(cls, func):
+        if cls._bound is None:
+            return None
+        bound = cls._bound.get()
+        return bound.get(func) if bound else None
@@ -5,7 +5,24 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from collections import namedtuple
 import threading
+import warnings
+
+from .compat import contextvars
+
+
+class ActionStackWarning(RuntimeWarning):
+    """
+    An action is popped from a stack it is not on top of, e.g. finished out
+    of order or in another context than the one it was started in. The
+    stack is left as is.
+    """
+
+
+def _warn_mismatched_pop(action, top):
+    warnings.warn('Action {!r} is not on top of the action stack, top is {!r}'
+                  .format(action, top), ActionStackWarning, stacklevel=3)
 
 
 class ActionStack(object):
@@ -19,8 +36,10 @@ class ActionStack(object):
         if action is None:
             return self._stack.pop()
 
-        if action is self.peek():
+        top = self.peek()
+        if action is top:
             return self._stack.pop()
+        _warn_mismatched_pop(action, top)
 
     def peek(self):
         if not self._stack:
@@ -34,9 +53,67 @@ class ActionStack(object):
 
         return self._stack[0]
 
+    def clear(self):
+        del self._stack[:]
+
 
 class ThreadLocalActionStack(threading.local, ActionStack):
     pass
 
 
-action_stack = ThreadLocalActionStack()
+_Node = namedtuple('_Node', ('action', 'parent', 'root'))
+
+
+class ContextVarActionStack(object):
+    """
+    Action stack stored in a context variable.
+
+    The stack is a linked list of immutable nodes, so a copied context (e.g.
+    a new asyncio task) shares the parent's actions without copying them,
+    and pushes made in one context never show up in another.
+    """
+
+    def __init__(self, name='tlogger_action_stack'):
+        if contextvars is None:
+            raise RuntimeError('contextvars module is not available')
+        self._var = contextvars.ContextVar(name, default=None)
+
+    def push(self, action):
+        top = self._var.get()
+        self._var.set(_Node(action, top, action if top is None else top.root))
+
+    def pop(self, action=None):
+        top = self._var.get()
+        if top is None:
+            if action is None:
+                raise IndexError('pop from empty action stack')
+            _warn_mismatched_pop(action, None)
+            return None
+
+        if action is None or action is top.action:
+            self._var.set(top.parent)
+            return top.action
+        _warn_mismatched_pop(action, top.action)
+
+    def peek(self):
+        top = self._var.get()
+        if top is None:
+            return None
+
+        return top.action
+
+    def root(self):
+        top = self._var.get()
+        if top is None:
+            return None
+
+        return top.root
+
+    def clear(self):
+        self._var.set(None)
+
+
+if contextvars is not None:
+    action_stack = ContextVarActionStack()
+else:
+    action_stack = ThreadLocalActionStack()
@@ -5,25 +5,80 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from itertools import chain
+from collections import namedtuple
+from functools import partial
+import logging
 
 from .action_stack import action_stack
-from .compat import string_types
+from .compat import perf_counter_ns, string_types, thread_time_ns
 from .constants import Level
 from .events import Event
+from .param_filter import HIDE, ParamFilter
+from .sampling import Sampler
 from .qualified_name import find_qualified_name
 from .serializers import KeyValueSerializer
-from .utils import create_logger, create_guid
+from .utils import (LoggerRef, capture_exc_info, capture_record_origin,
+                    create_guid, get_logger_ref)
+
+
+# Static part of actions created for every call of a decorated function
+ActionSpec = namedtuple('ActionSpec', (
+    'name', 'logger', 'level', 'uid', 'uid_field_name', 'params',
+    'action_stack', 'sensitive_params', 'hide_params', 'trace_exception',
+    'context_object', 'full_name', 'sample_rate', 'param_filter',
+    'slow_threshold',
+))
 
 
 class Action(object):
+    # `__dict__` is only allocated when something not listed here is set
+    # on an instance, e.g. by subclasses or `mock.patch.object`
+    __slots__ = (
+        'name', 'logger', 'level', 'status_code', 'status_message', 'params',
+        'uid_field_name', 'uid', '_uid_item', 'action_stack',
+        'sensitive_params', 'hide_params', 'param_filter', 'trace_exception',
+        'context_object', '_full_name', 'sample_rate', 'sampled',
+        '_presampled', 'slow_threshold', '_started', '_elapsed', '_span',
+        '__dict__', '__weakref__',
+    )
+
     CLEANSED_SUBSTITUTE = '******'
     NAME_CHAIN_SEP = '.'
     NAME_SUFFIX_SEP = '.'
+    INLINE_FIELDS = ('raw',)
+
+    # Turns events into log messages, see `tlogger.serializers`
+    serializer_class = KeyValueSerializer
+
+    # :class:`tlogger.pipeline.EmissionPipeline` to hand events over to
+    # instead of writing them in the calling thread, see `tlogger.pipeline`
+    pipeline = None
+
+    # :class:`tlogger.sampling.Sampler` deciding which actions to log
+    sampler = None
+
+    # :class:`tlogger.renderers.ParamRenderer` bounding logged param values
+    param_renderer = None
+
+    # Add CPU time of the thread (`cpu_ms`) to `duration_ms` of finished
+    # actions; meaningless for actions spanning threads or awaits
+    measure_cpu_time = False
+
+    # Level of finish events of actions lasting `slow_threshold` ms or more
+    slow_level = Level.warning
+
+    # :class:`tlogger.metrics.Metrics` to count finished actions in instead
+    # of logging their start and finish events, see `tlogger.metrics`
+    metrics = None
+
+    # :class:`tlogger.tracing.SpanExporter` to export actions to as spans
+    span_exporter = None
 
     def __init__(self, name, logger, level=Level.info, uid=None, uid_field_name='id',
                  params=None, action_stack=action_stack, sensitive_params=None,
-                 hide_params=None, trace_exception=False, context_object=None):
+                 hide_params=None, trace_exception=False, context_object=None,
+                 full_name=None, sample_rate=None, param_filter=None,
+                 slow_threshold=None):
 
         # TODO: make `context_object` parameter explicitly required (positional)
         # (and break backward compatibility)
@@ -41,13 +96,28 @@ class Action(object):
 
         self.uid_field_name = uid_field_name
         self.uid = uid
+        self._uid_item = None
 
         self.action_stack = action_stack
         self.sensitive_params = sensitive_params or ()
         self.hide_params = hide_params or ()
+        if param_filter is None:
+            param_filter = self.compile_param_filter(hide_params,
+                                                     sensitive_params)
+        self.param_filter = param_filter
 
         self.trace_exception = trace_exception
         self.context_object = context_object
+        self._full_name = full_name
+
+        self.sample_rate = sample_rate
+        self.sampled = True
+        self._presampled = False
+
+        self.slow_threshold = slow_threshold
+        self._started = None
+        self._elapsed = None
+        self._span = None
 
     def __enter__(self):
         self.start()
@@ -64,7 +134,9 @@ class Action(object):
             'Action({name!r}, {logger!r}, level={level!r}, uid={uid!r}, '
             'uid_field_name={uid_field_name!r}, params={params!r}, '
             'action_stack={action_stack!r})'
-            .format(**vars(self))
+            .format(name=self.name, logger=self.logger, level=self.level,
+                    uid=self.uid, uid_field_name=self.uid_field_name,
+                    params=self.params, action_stack=self.action_stack)
         )
 
     def __str__(self):
@@ -94,7 +166,59 @@ class Action(object):
                    context_object=context_object)
 
     @classmethod
-    def create_ad_hoc(cls, logger, context_object, params=None):
+    def make_spec(cls, name, logger, context_object, **kwargs):
+        """
+        Return :class:`ActionSpec` of actions created with given arguments.
+
+        Takes the same arguments as the constructor; full name and param
+        filter are computed once here instead of for every action.
+        """
+        prototype = cls(name, logger, context_object=context_object, **kwargs)
+        return ActionSpec(
+            name=prototype.name,
+            logger=prototype.logger,
+            level=prototype.level,
+            uid=prototype.uid,
+            uid_field_name=prototype.uid_field_name,
+            params=prototype.params,
+            action_stack=prototype.action_stack,
+            sensitive_params=prototype.sensitive_params,
+            hide_params=prototype.hide_params,
+            trace_exception=prototype.trace_exception,
+            context_object=prototype.context_object,
+            full_name=prototype._get_full_name(),
+            sample_rate=prototype.sample_rate,
+            param_filter=prototype.param_filter,
+            slow_threshold=prototype.slow_threshold,
+        )
+
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Create an action from :class:`ActionSpec` bypassing the constructor.
+
+        Only params and status are per action, params of the spec are copied.
+        """
+        self = cls.__new__(cls)
+        (self.name, self.logger, self.level, self.uid, self.uid_field_name,
+         params, self.action_stack, self.sensitive_params, self.hide_params,
+         self.trace_exception, self.context_object, self._full_name,
+         self.sample_rate, self.param_filter, self.slow_threshold) = spec
+
+        self.status_code = 0
+        self.status_message = ''
+        self.params = dict(params) if params else {}
+        self._uid_item = None
+        self.sampled = True
+        self._presampled = False
+        self._started = None
+        self._elapsed = None
+        self._span = None
+        return self
+
+    @classmethod
+    def create_ad_hoc(cls, logger, context_object, params=None,
+                      full_name=None):
         uid_field_name, uid = cls.generate_uid_tuple()
         return cls(
             name='ad_hoc_action',
@@ -102,34 +226,105 @@ class Action(object):
             uid_field_name=uid_field_name, uid=uid,
             params=params,
             context_object=context_object,
+            full_name=full_name,
         )
 
+    # Callable returning a new guid string, see `tlogger.utils` for cheaper
+    # alternatives to the default uuid4
+    guid_factory = staticmethod(create_guid)
+
     @classmethod
     def generate_uid_tuple(cls):
-        return 'guid', create_guid()
+        return 'guid', cls.guid_factory()
+
+    def sample(self):
+        """
+        Decide whether the action is sampled ahead of :meth:`start`, which
+        keeps the decision, so building params of an unsampled action can be
+        skipped.
+
+        :rtype: bool
+        """
+        self.sampled = self._sample()
+        self._presampled = True
+        return self.sampled
 
     def start(self, event_name='start'):
+        if self._presampled:
+            self._presampled = False
+        else:
+            self.sampled = self._sample()
+        parent = self.action_stack.peek()
         self.action_stack.push(self)
-        self.emit_event(event_name, include_params=True)
+        if self._logs_events():
+            self.emit_event(event_name, include_params=True)
+        if self.span_exporter is not None and self.sampled:
+            self._span = self.span_exporter.start_span(self, parent)
+        self._start_clock()
 
     def finish(self, event_name='finish'):
-        self.emit_event(event_name, include_status=True)
-        self.action_stack.pop(self)
+        try:
+            elapsed = self._stop_clock()
+            self._record(elapsed)
+
+            if not self._logs_events():
+                return
+
+            if self.slow_threshold is not None and elapsed is not None and \
+                    elapsed[0] >= self.slow_threshold * 1000000 and \
+                    self.slow_level.value > self.level.value:
+                self.emit_event(event_name, level=self.slow_level,
+                                include_status=True)
+            else:
+                self.emit_event(event_name, include_status=True)
+        finally:
+            self.action_stack.pop(self)
 
     def fail(self, exc_type=None, exc_val=None, exc_tb=None,
              event_name='error'):
-
-        payload = {}
-        if exc_type:
-            payload['exc_type'] = exc_type
-        if exc_val:
-            payload['exc_val'] = exc_val
-
-        self.emit_event(
-            event_name, payload=payload or None, include_status=True,
-            trace_exception=self.trace_exception
-        )
-        self.action_stack.pop(self)
+        try:
+            self._record(self._stop_clock(), True, exc_type, exc_val)
+
+            if not self.is_enabled_for():
+                return
+
+            payload = {}
+            if exc_type:
+                payload['exc_type'] = exc_type
+            if exc_val:
+                payload['exc_val'] = exc_val
+
+            if self.sampled and self._logs_events():
+                self.emit_event(
+                    event_name, payload=payload or None, include_status=True,
+                    trace_exception=self.trace_exception
+                )
+            elif self._always_on_error():
+                # Start event was not emitted, so carry params in the error
+                # one
+                self.sampled = True
+                self.emit_event(
+                    event_name, payload=payload or None, include_params=True,
+                    include_status=True, trace_exception=self.trace_exception
+                )
+        finally:
+            self.action_stack.pop(self)
+
+    def _logs_events(self):
+        """Whether start and finish events are logged (errors always are)."""
+        return (self.metrics is None or self.metrics.log_events) and \
+            (self.span_exporter is None or self.span_exporter.log_events)
+
+    def _record(self, elapsed, error=False, exc_type=None, exc_val=None):
+        """Pass a finished action to metrics and span exporter, if any."""
+        if self.metrics is not None:
+            self.metrics.record(self._get_full_name(),
+                                elapsed and elapsed[0], self.status_code,
+                                error=error)
+        if self._span is not None and elapsed is not None:
+            span, self._span = self._span, None
+            self.span_exporter.end_span(self, span, elapsed[0], error,
+                                        exc_type, exc_val)
 
     def emit_event(self, suffix, payload=None, event_class=None, level=None,
                    raw_msg='', raw_args=None, raw_kwargs=None,
@@ -139,6 +334,13 @@ class Action(object):
         if level is None:
             level = self.level
 
+        if not self.sampled and not (level.value >= logging.ERROR and
+                                     self._always_on_error()):
+            return
+
+        if not self.is_enabled_for(level):
+            return
+
         # Get `event`, `status` and `guid/id` fields
         event_params = self._event_context(
             suffix, include_params=include_params, include_status=include_status
@@ -151,20 +353,31 @@ class Action(object):
         if raw_msg:
             event_params['raw'] = raw_msg
 
-        event = (event_class or Event)(event_params)
-
-        serializer = KeyValueSerializer(event, inline=['raw'])
-        format_string = serializer.format_string()
-        arguments = serializer.arguments()
-
-        args = chain(arguments, raw_args or ())
         kwargs = raw_kwargs or {}
 
         if trace_exception:
             kwargs['exc_info'] = trace_exception
 
         logger = self.get_logger()
-        logger.log(level.value, format_string, *args, **kwargs)
+
+        if self.pipeline is not None:
+            if kwargs.get('exc_info'):
+                kwargs['exc_info'] = capture_exc_info(kwargs['exc_info'])
+            self.pipeline.put((self.__class__, logger, level, event_class,
+                               event_params, raw_args, kwargs,
+                               capture_record_origin()))
+        else:
+            self.write_event(logger, level, event_class, event_params,
+                             raw_args, kwargs)
+
+    @classmethod
+    def write_event(cls, logger, level, event_class, event_params, raw_args,
+                    kwargs):
+        event = (event_class or Event)(event_params)
+
+        serializer = cls.serializer_class(event, inline=cls.INLINE_FIELDS)
+        msg, args = serializer.log_args(raw_args)
+        logger.log(level.value, msg, *args, **kwargs)
 
     def add_params(self, dictionary=None, **kwargs):
         if dictionary is None:
@@ -186,64 +399,169 @@ class Action(object):
     def context_name(self):
         return find_qualified_name(self.context_object)
 
+    @classmethod
+    def build_full_name(cls, name, context_object):
+        return cls.NAME_CHAIN_SEP.join(
+            filter(None, (find_qualified_name(context_object), name)))
+
     def _get_full_name(self):
-        return self.NAME_CHAIN_SEP.join(
-            filter(None, (self.context_name, self.name)))
+        if self._full_name is None:
+            self._full_name = self.build_full_name(self.name,
+                                                   self.context_object)
+        return self._full_name
 
     def _event_context(self, suffix, include_params=False,
                        include_status=False):
 
-        context = {
-            'event': self.NAME_SUFFIX_SEP.join((self._get_full_name(), suffix))
-        }
-        context.update(self._get_root_uid_item())
+        context = dict(self._get_root_uid_item())
+        context['event'] = self.NAME_SUFFIX_SEP.join(
+            (self._get_full_name(), suffix))
 
-        filtered_params = self._filter_hidden_params(self.params)
-        filtered_params['call_params'] = self._filter_hidden_params(
-            filtered_params.get('call_params', {}))
-
-        cleansed_params = filtered_params
-        cleansed_params['call_params'] = self._cleanse_params(
-            filtered_params.get('call_params', {}))
+        param_filter = self.param_filter
+        renderer = self.param_renderer
+        render = renderer.wrap if renderer is not None else None
 
         if include_params:
-            context.update(cleansed_params)
+            param_filter.filter(self.params, target=context, render=render)
+            # Always present, empty when there are none or they are hidden
+            if 'call_params' not in context:
+                context['call_params'] = {}
 
         if include_status:
             context.update(status_code=self.status_code)
+            elapsed = self._stop_clock()
+            if elapsed is not None:
+                context['duration_ms'] = round(elapsed[0] / 1e6, 3)
+                if elapsed[1] is not None:
+                    context['cpu_ms'] = round(elapsed[1] / 1e6, 3)
             if self.status_message:
                 context.update(status_msg=self.status_message)
-            if 'result' in cleansed_params:
-                context.update(result=cleansed_params['result'])
+            if 'result' in self.params and \
+                    param_filter.disposition('result') is not HIDE:
+                result = self.params['result']
+                context.update(result=result if render is None
+                               else render(result))
 
         return context
 
     def get_logger(self):
         logger = self.logger
 
-        if isinstance(self.logger, string_types):
-            logger = create_logger(self.logger)
+        if isinstance(logger, LoggerRef):
+            return logger()
+
+        if isinstance(logger, string_types):
+            return get_logger_ref(logger)()
 
         return logger
 
+    def is_enabled_for(self, level=None):
+        """
+        Check if the logger would process an event of `level`.
+
+        Relies on ``logging.Logger.isEnabledFor``, which caches the result per
+        level and drops the cache whenever logging is reconfigured.
+        """
+        if level is None:
+            level = self.level
+        return self.get_logger().isEnabledFor(level.value)
+
+    def _start_clock(self):
+        cpu_started = None
+        if self.measure_cpu_time and thread_time_ns is not None:
+            cpu_started = thread_time_ns()
+        self._started = (perf_counter_ns(), cpu_started)
+
+    def _stop_clock(self):
+        """
+        Return ``(duration, cpu_time)`` in ns of a started action, or None.
+
+        Measured on first call, so all events of a finished action carry
+        the same figures. `cpu_time` is None unless `measure_cpu_time`.
+        """
+        if self._elapsed is None and self._started is not None:
+            started, cpu_started = self._started
+            self._elapsed = (
+                perf_counter_ns() - started,
+                None if cpu_started is None else
+                thread_time_ns() - cpu_started,
+            )
+        return self._elapsed
+
+    def _sample(self):
+        parent = self.action_stack.peek()
+        if parent is not None and not getattr(parent, 'sampled', True):
+            return False
+
+        rate = self.sample_rate
+        if rate is None and self.sampler is not None:
+            rate = self.sampler.get_rate(self._get_full_name(),
+                                         root=parent is None)
+
+        return (self.sampler or Sampler).sample(rate)
+
+    def _always_on_error(self):
+        return self.sampler is None or self.sampler.always_on_error
+
+    @classmethod
+    def compile_param_filter(cls, hide_params=None, sensitive_params=None):
+        return ParamFilter.compile(hide_params, sensitive_params,
+                                   substitute=cls.CLEANSED_SUBSTITUTE)
+
     def get_uid_item(self):
-        if self.uid is None:
-            self.uid_field_name, self.uid = self.generate_uid_tuple()
+        return dict(self.uid_item)
 
-        return {self.uid_field_name: self.uid}
+    @property
+    def uid_item(self):
+        """
+        Read-only ``{uid_field_name: uid}`` dict, generating uid if needed.
+
+        The dict is built once and reused for every event of the action and
+        of all actions nested in it.
+        """
+        item = self._uid_item
+        if item is None or self.uid_field_name not in item or \
+                item[self.uid_field_name] is not self.uid:
+            if self.uid is None:
+                self.uid_field_name, self.uid = self.generate_uid_tuple()
+            item = self._uid_item = {self.uid_field_name: self.uid}
+        return item
 
     def _get_root_uid_item(self):
-        return (self.action_stack.root() or self).get_uid_item()
-
-    def _cleanse_params(self, params):
-        return {
-            k: self.CLEANSED_SUBSTITUTE if k in self.sensitive_params else v
-            for k, v in params.items()
-        }
-
-    def _filter_hidden_params(self, params):
-        return {
-            k: v
-            for k, v in params.items()
-            if k not in self.hide_params
-        }
+        return (self.action_stack.root() or self).uid_item
+
+
+def make_action_factory(action_class, name, logger, context_object, **params):
+    """
+    Return a callable without arguments creating actions for a decorated
+    function.
+
+    Subclasses of :class:`Action` keeping its constructor are created
+    from a spec computed once, see :meth:`Action.from_spec`. Any other
+    `action_class` is called with given arguments every time: a custom
+    constructor may not accept anything else. Full name of subclasses with
+    one is still computed once and set after construction.
+    """
+    create_action = partial(action_class, name=name, logger=logger,
+                            context_object=context_object, **params)
+
+    if not isinstance(action_class, type) or \
+            not issubclass(action_class, Action):
+        return create_action
+
+    mro = action_class.__mro__
+    if not any('__init__' in vars(klass)
+               for klass in mro[:mro.index(Action)]):
+        spec = action_class.make_spec(name, logger, context_object, **params)
+        return partial(action_class.from_spec, spec)
+
+    full_name = action_class.build_full_name(name, context_object)
+
+    def create_custom_action():
+        action = create_action()
+        if action._full_name is None and action.name is name and \
+                action.context_object is context_object:
+            action._full_name = full_name
+        return action
+
+    return create_custom_action
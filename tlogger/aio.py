@@ -0,0 +1,154 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Coroutine and async generator support.
+
+This module uses `async def` syntax and is only imported on Python 3.6+,
+see :data:`tlogger.compat.ASYNC_AVAILABLE`.
+"""
+
+from functools import wraps
+import sys
+
+from .action_binder import ContextVarActionBinder
+from .actions import make_action_factory
+from .call_args import (add_call_params, add_error_call_params,
+                        make_call_args_binder)
+from .proxies import BaseProxy, ContextManagerProxy
+
+
+def wrap_coroutine_function(func, action_class, logger, **params):
+    """
+    Wrap coroutine function into an action.
+
+    The action starts when the coroutine starts running and finishes (or
+    fails) when it returns (or raises), so the awaited result is logged.
+
+    See :func:`tlogger.decorators.wrap_function` for parameters.
+    """
+    action_name = params.pop('action_name', None)
+    bind_call_args = make_call_args_binder(func)
+    create_action = make_action_factory(action_class, action_name, logger,
+                                        func, **params)
+
+    @wraps(func)
+    async def decorator(*args, **kwargs):
+        action = create_action()
+        if action.sample():
+            add_call_params(action, bind_call_args, args, kwargs)
+
+        with action:
+            try:
+                with ContextVarActionBinder(decorator, action):
+                    result = await func(*args, **kwargs)
+            except BaseException:
+                add_error_call_params(action, bind_call_args, args, kwargs)
+                raise
+
+            action.add_result(result)
+            return result
+
+    return decorator
+
+
+def wrap_async_generator_function(func, action_class, logger, **params):
+    """
+    Wrap async generator function into an action.
+
+    The action starts on the first iteration and finishes when the generator
+    is exhausted or closed, or fails when it raises.
+
+    See :func:`tlogger.decorators.wrap_function` for parameters.
+    """
+    action_name = params.pop('action_name', None)
+    bind_call_args = make_call_args_binder(func)
+    create_action = make_action_factory(action_class, action_name, logger,
+                                        func, **params)
+
+    @wraps(func)
+    async def decorator(*args, **kwargs):
+        action = create_action()
+        if action.sample():
+            add_call_params(action, bind_call_args, args, kwargs)
+
+        action.start()
+        try:
+            iterator = func(*args, **kwargs).__aiter__()
+            while True:
+                # Bound for one step at a time: steps may run in different
+                # contexts and the binding must not leak to the consumer
+                token = ContextVarActionBinder.bind(decorator, action)
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    ContextVarActionBinder.unbind(token)
+                yield item
+        except GeneratorExit:
+            action.finish()
+            raise
+        except BaseException:
+            add_error_call_params(action, bind_call_args, args, kwargs)
+            action.fail(*sys.exc_info())
+            raise
+        else:
+            action.finish()
+
+    return decorator
+
+
+class AsyncIterableProxy(BaseProxy):
+    def __init__(self, obj, action, steps=False):
+        super(AsyncIterableProxy, self).__init__(obj, action)
+        self._iterator = obj.__aiter__()
+        self._steps = steps
+        self._count = 0
+        self._started = False
+        self._finished = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._started:
+            self._action.start()
+            self._started = True
+
+        try:
+            value = await self._iterator.__anext__()
+            if self._steps:
+                self._action.emit_event(
+                    'step',
+                    {'value': value, 'step': self._count}
+                )
+            self._count += 1
+            return value
+        except StopAsyncIteration:
+            if not self._finished:
+                self._action.finish()
+                self._finished = True
+            raise
+        except BaseException:
+            if not self._finished:
+                self._action.fail(*sys.exc_info())
+                self._finished = True
+            raise
+
+
+class AsyncContextManagerProxy(ContextManagerProxy):
+    async def __aenter__(self):
+        self._action.add_param(obj=self._wrapped)
+        self._action.start('enter')
+
+        await self._wrapped.__aenter__()
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._wrapped.__aexit__(exc_type, exc_val, exc_tb)
+
+        if exc_val is None:
+            self._action.finish('exit')
+        else:
+            self._action.fail(exc_type, exc_val, exc_tb,
+                              event_name='exit_with_error')
@@ -8,20 +8,61 @@ from __future__ import unicode_literals
 import logging
 import time
 
+from .compat import PY3, string_types
+from .serializers import quote_argument
+
 
 class TLoggerFormatter(logging.Formatter):
+    """
+    Formatter with ISO-8601 UTC timestamps.
+
+    The date and time part of a timestamp is rendered once per second and
+    reused, only the zero-padded fraction (see `timespec`) is formatted per
+    record.
+    """
 
     converter = time.gmtime
-    FMT = "ts=%(asctime)s.%(msecs)dZ level=%(levelname)s %(message)s"
+    FMT = "ts=%(asctime)sZ level=%(levelname)s %(message)s"
     DATEFMT = "%Y-%m-%dT%H:%M:%S"
 
-    def __init__(self, fmt=None, datefmt=None):
+    FRACTION_FORMATS = {
+        'seconds': None,
+        'milliseconds': ('%s.%03d', 1000),
+        'microseconds': ('%s.%06d', 1000000),
+    }
+
+    def __init__(self, fmt=None, datefmt=None, timespec=None):
+        if timespec is None:
+            # Custom formats may render fraction on their own with `msecs`
+            timespec = 'milliseconds' if fmt is None else 'seconds'
+        if timespec not in self.FRACTION_FORMATS:
+            raise ValueError('Unknown timespec: {!r}'.format(timespec))
         if fmt is None:
             fmt = self.FMT
         if datefmt is None:
             datefmt = self.DATEFMT
         super(TLoggerFormatter, self).__init__(fmt, datefmt)
 
+        self.timespec = timespec
+        self._fraction_format = self.FRACTION_FORMATS[timespec]
+        self._cached_second = (None, None, None)
+
+    def formatTime(self, record, datefmt=None):
+        created = record.created
+        second = int(created)
+
+        cached_second, cached_datefmt, prefix = self._cached_second
+        if cached_second != second or cached_datefmt != datefmt:
+            prefix = time.strftime(datefmt or self.DATEFMT,
+                                   self.converter(second))
+            self._cached_second = (second, datefmt, prefix)
+
+        if self._fraction_format is None:
+            return prefix
+
+        template, scale = self._fraction_format
+        return template % (prefix, int((created - second) * scale))
+
 
 class TLoggerLogRecord(logging.LogRecord):
     def getMessage(self):
@@ -29,34 +70,42 @@ class TLoggerLogRecord(logging.LogRecord):
         Return the message for this LogRecord.
 
         Return the message for this LogRecord after merging any user-supplied
-        arguments with the message.
+        arguments, quoted and escaped, with the message. The result is cached
+        on the record, so several handlers do not render it again.
         """
-        if not logging._unicode:  # if no unicode support...
-            msg = str(self.msg)
-        else:
-            msg = self.msg
-            if not isinstance(msg, basestring):
-                try:
-                    msg = str(self.msg)
-                except UnicodeError:
-                    msg = self.msg  # Defer encoding till later
+        cached = self.__dict__.get('_tlogger_message')
+        if cached is not None and cached[0] is self.msg and \
+                cached[1] is self.args:
+            return cached[2]
+
+        msg = self.msg
+        if not isinstance(msg, string_types):
+            try:
+                msg = str(self.msg)
+            except UnicodeError:
+                msg = self.msg  # Defer encoding till later
         if self.args:
-            msg = msg % tuple(
-                '"{}"'.format(str(arg).encode('unicode_escape').decode())
-                for arg in self.args
-            )
+            msg = msg % tuple(map(quote_argument, self.args))
+
+        self._tlogger_message = (self.msg, self.args, msg)
         return msg
 
 
 class TLoggerLogger(logging.Logger):
     """Yep, this is not what you think this is."""
 
-    def makeRecord(self, name, level, fn, lno, msg, args, exc_info, func=None, extra=None):
+    def makeRecord(self, name, level, fn, lno, msg, args, exc_info, func=None,
+                   extra=None, sinfo=None):
         """
         A factory method which can be overridden in subclasses to create
         specialized LogRecords.
         """
-        rv = TLoggerLogRecord(name, level, fn, lno, msg, args, exc_info, func)
+        if PY3:
+            rv = TLoggerLogRecord(name, level, fn, lno, msg, args, exc_info,
+                                  func, sinfo)
+        else:
+            rv = TLoggerLogRecord(name, level, fn, lno, msg, args, exc_info,
+                                  func)
         if extra is not None:
             for key in extra:
                 if (key in ["message", "asctime"]) or (key in rv.__dict__):
@@ -0,0 +1,98 @@
+# -*- mode: python; coding: utf-8; -*-
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from functools import partial
+import inspect
+
+
+def make_call_args_binder(func):
+    """
+    Build a function mapping call arguments of `func` to parameter names.
+
+    The result is equal to ``inspect.getcallargs(func, *args, **kwargs)``,
+    but the signature of `func` is inspected once, here, instead of on every
+    call. Positional calls of functions without ``*args``, ``**kwargs`` and
+    keyword-only parameters (the most common case for small functions) are
+    bound with a plain ``zip``.
+
+    :param func: a callable to bind arguments for
+    :type func: function
+
+    :return: binder function taking the same arguments as `func`
+    :rtype: function
+    """
+    if not hasattr(inspect, 'BoundArguments') or \
+            not hasattr(inspect.BoundArguments, 'apply_defaults'):
+        # Python < 3.5
+        return partial(inspect.getcallargs, func)
+
+    bound_args = ()
+    target = func
+    if inspect.ismethod(func):
+        bound_args = (func.__self__,)
+        target = func.__func__
+
+    try:
+        # Like `getcallargs`, don't follow `__wrapped__`: a decorator may
+        # take other arguments than the function it wraps
+        signature = inspect.signature(target, follow_wrapped=False)
+    except (TypeError, ValueError):
+        return partial(inspect.getcallargs, func)
+
+    names = tuple(signature.parameters)
+    simple = all(
+        parameter.kind == parameter.POSITIONAL_OR_KEYWORD
+        for parameter in signature.parameters.values()
+    )
+    defaults = tuple(
+        parameter.default
+        for parameter in signature.parameters.values()
+        if parameter.default is not parameter.empty
+    )
+    required = len(names) - len(defaults)
+    bind = signature.bind
+
+    def bind_call_args(*given_args, **kwargs):
+        args = bound_args + given_args if bound_args else given_args
+
+        if simple and not kwargs and required <= len(args) <= len(names):
+            call_args = dict(zip(names, args))
+            if len(args) < len(names):
+                call_args.update(zip(names[len(args):],
+                                     defaults[len(args) - required:]))
+            return call_args
+
+        try:
+            bound = bind(*args, **kwargs)
+        except TypeError:
+            # Errors of `Signature.bind` don't name the function, the ones
+            # of `getcallargs` do
+            return inspect.getcallargs(func, *given_args, **kwargs)
+        bound.apply_defaults()
+        return dict(bound.arguments)
+
+    return bind_call_args
+
+
+def add_call_params(action, bind_call_args, args, kwargs):
+    """Add arguments of a call bound by `bind_call_args` to `action`."""
+    func_call_params = bind_call_args(*args, **kwargs)
+    if func_call_params:
+        action.add_params(func_call_params)
+
+
+def add_error_call_params(action, bind_call_args, args, kwargs):
+    """
+    Add call params to an unsampled action about to fail: they were skipped
+    on call, but its error event is still logged with params.
+    """
+    if action.sampled:
+        return
+    try:
+        add_call_params(action, bind_call_args, args, kwargs)
+    except TypeError:  # wrong arguments, the call raised on them already
+        pass
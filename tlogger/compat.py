@@ -9,7 +9,44 @@ import sys
 
 
 PY3 = sys.version[0] == '3'
+
+# `async def` functions and async generators
+ASYNC_AVAILABLE = sys.version_info >= (3, 6)
 if PY3:
     string_types = (str,)
 else:
     string_types = (str, unicode)
+
+try:
+    import contextvars
+except ImportError:  # Python < 3.7
+    contextvars = None
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue  # noqa: F401
+
+try:
+    from time import perf_counter_ns
+except ImportError:  # Python < 3.7
+    try:
+        from time import perf_counter as _perf_counter
+    except ImportError:  # Python 2
+        from time import time as _perf_counter
+
+    def perf_counter_ns():
+        return int(_perf_counter() * 1e9)
+
+try:
+    from time import thread_time_ns
+except ImportError:  # Python < 3.7 or no per-thread CPU clock
+    thread_time_ns = None
+
+try:
+    from time import time_ns
+except ImportError:  # Python < 3.7
+    from time import time as _time
+
+    def time_ns():
+        return int(_time() * 1e9)
@@ -0,0 +1,94 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Propagation of the current action to other threads and processes.
+
+Actions live on a per-thread (or per-context) stack, so work handed to
+another thread or process doesn't know which action it belongs to and its
+events get a new guid. Capture a token where the work is handed off and
+resume it where the work is done::
+
+    token = capture_context()
+
+    # in another thread or process
+    with resume_context(token):
+        logger.info('done')  # has guid of the action the token came from
+
+See :mod:`tlogger.executor` for executors doing it automatically.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from collections import namedtuple
+from contextlib import contextmanager
+
+from .action_stack import action_stack
+
+# Picklable state of the action stack: uid of the root action, sampling
+# decision and, if the action is exported as a span, its trace and span ids
+ActionToken = namedtuple('ActionToken', (
+    'uid_field_name', 'uid', 'sampled', 'trace_id', 'span_id',
+))
+
+
+class ResumedContext(object):
+    """
+    Stands for actions of a token on the action stack of another thread.
+
+    Actions nested in it share the uid of its root action, its sampling
+    decision and parent span, but it emits no events of its own.
+    """
+
+    __slots__ = ('token', 'uid_item', 'sampled', '_span')
+
+    def __init__(self, token):
+        self.token = token
+        self.uid_item = {token.uid_field_name: token.uid}
+        self.sampled = token.sampled
+        self._span = None
+        if token.trace_id is not None:
+            self._span = (token.trace_id, token.span_id)
+
+    def __repr__(self):
+        return str('ResumedContext({!r})'.format(self.token))
+
+
+def capture_context(stack=action_stack):
+    """
+    Return :class:`ActionToken` of the current action or None if there is
+    no action.
+    """
+    top = stack.peek()
+    if top is None:
+        return None
+
+    (uid_field_name, uid), = stack.root().uid_item.items()
+    span = getattr(top, '_span', None)
+    return ActionToken(
+        uid_field_name=uid_field_name,
+        uid=uid,
+        sampled=getattr(top, 'sampled', True),
+        trace_id=span[0] if span else None,
+        span_id=span[1] if span else None,
+    )
+
+
+@contextmanager
+def resume_context(token, stack=action_stack):
+    """
+    Make actions started within belong to those `token` was captured in.
+
+    Does nothing if `token` is None.
+    """
+    if token is None:
+        yield
+        return
+
+    context = ResumedContext(token)
+    stack.push(context)
+    try:
+        yield
+    finally:
+        stack.pop(context)
@@ -7,8 +7,16 @@ from __future__ import unicode_literals
 
 from functools import wraps
 import inspect
+import weakref
 
 from .action_binder import ActionBinder
+from .actions import make_action_factory
+from .call_args import (add_call_params, add_error_call_params,
+                        make_call_args_binder)
+from .compat import ASYNC_AVAILABLE
+
+if ASYNC_AVAILABLE:
+    from .aio import wrap_async_generator_function, wrap_coroutine_function
 
 
 def wrap_function(func, action_class, logger, **params):
@@ -30,20 +38,31 @@ def wrap_function(func, action_class, logger, **params):
     :return: wrapping function
     :rtype: function
     """
+    if ASYNC_AVAILABLE:
+        if inspect.iscoroutinefunction(func):
+            return wrap_coroutine_function(func, action_class, logger, **params)
+        if inspect.isasyncgenfunction(func):
+            return wrap_async_generator_function(func, action_class, logger,
+                                                 **params)
+
     action_name = params.pop('action_name', None)
+    bind_call_args = make_call_args_binder(func)
+    create_action = make_action_factory(action_class, action_name, logger,
+                                        func, **params)
 
     @wraps(func)
     def decorator(*args, **kwargs):
-        action = action_class(name=action_name, logger=logger,
-                              context_object=func, **params)
-        func_call_params = inspect.getcallargs(func, *args, **kwargs)
-
-        if func_call_params:
-            action.add_params(func_call_params)
+        action = create_action()
+        if action.sample():
+            add_call_params(action, bind_call_args, args, kwargs)
 
         with action:
-            with ActionBinder(decorator, action):
-                result = func(*args, **kwargs)
+            try:
+                with ActionBinder(decorator, action):
+                    result = func(*args, **kwargs)
+            except BaseException:
+                add_error_call_params(action, bind_call_args, args, kwargs)
+                raise
 
             action.add_result(result)
             return result
@@ -52,20 +71,70 @@ def wrap_function(func, action_class, logger, **params):
 
 
 def wrap_descriptor_method(descriptor, action_class, logger, **params):
-    class DescriptorProxy(object):
-        def __get__(self, instance, owner):
-            func = descriptor.__get__(instance, owner)
-            if callable(func):
-                return wrap_function(func, action_class, logger, **params)
-            return func
-
-        def __call__(self, *args, **kwargs):
-            return (
-                wrap_function(descriptor, action_class, logger, **params)
-                (*args, **kwargs)
-            )
-
-        def __getattr__(self, item):
-            return getattr(descriptor, item)
-
-    return DescriptorProxy()
+    """
+    Wrap a method descriptor into an action.
+
+    Plain functions, static and class methods are wrapped once and keep
+    binding natively, so calling them costs the same as calling a decorated
+    function. Other descriptors are proxied: callables they return are
+    wrapped on access and cached per underlying function once it is
+    returned again.
+
+    See :func:`wrap_function` for parameters.
+    """
+    if inspect.isfunction(descriptor):
+        return wrap_function(descriptor, action_class, logger, **params)
+
+    if isinstance(descriptor, (staticmethod, classmethod)):
+        return type(descriptor)(
+            wrap_function(descriptor.__func__, action_class, logger, **params)
+        )
+
+    return DescriptorProxy(descriptor, action_class, logger, **params)
+
+
+class DescriptorProxy(object):
+    def __init__(self, descriptor, action_class, logger, **params):
+        self._descriptor = descriptor
+        self._action_class = action_class
+        self._logger = logger
+        self._params = params
+        self._wrapped = weakref.WeakKeyDictionary()
+        self._seen = weakref.WeakSet()
+
+    def _wrap(self, func):
+        try:
+            return self._wrapped[func]
+        except KeyError:
+            pass
+        except TypeError:  # not weak referenceable or not hashable
+            return self._create_wrapper(func)
+
+        # A wrapper references its function, so a cached one is never
+        # released. Descriptors like `functools.partialmethod` return a new
+        # callable on every access: only cache callables seen twice.
+        if func not in self._seen:
+            self._seen.add(func)
+            return self._create_wrapper(func)
+
+        self._seen.discard(func)
+        wrapped = self._wrapped[func] = self._create_wrapper(func)
+        return wrapped
+
+    def _create_wrapper(self, func):
+        return wrap_function(func, self._action_class, self._logger,
+                             **self._params)
+
+    def __get__(self, instance, owner):
+        func = self._descriptor.__get__(instance, owner)
+        if inspect.ismethod(func):
+            return self._wrap(func.__func__).__get__(func.__self__, owner)
+        if callable(func):
+            return self._wrap(func)
+        return func
+
+    def __call__(self, *args, **kwargs):
+        return self._wrap(self._descriptor)(*args, **kwargs)
+
+    def __getattr__(self, item):
+        return getattr(self._descriptor, item)
@@ -0,0 +1,30 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Async support of :class:`tlogger.django.middleware.RequestActionMiddleware`.
+
+This module uses `async def` syntax and is only imported on Python 3.6+,
+see :data:`tlogger.compat.ASYNC_AVAILABLE`.
+"""
+
+import asyncio
+import sys
+
+try:
+    from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+except ImportError:  # asgiref < 3.6
+    iscoroutinefunction = asyncio.iscoroutinefunction
+
+    def markcoroutinefunction(func):
+        func._is_coroutine = asyncio.coroutines._is_coroutine
+        return func
+
+
+async def call_middleware_async(middleware, request):
+    action = middleware.start_action(request)
+    try:
+        response = await middleware.get_response(request)
+    except BaseException:
+        middleware.fail_action(request, action, *sys.exc_info())
+        raise
+    middleware.finish_action(request, action, response)
+    return response
@@ -5,10 +5,19 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import sys
+import weakref
+
 from django.conf import settings
 
 from ..action_binder import ActionBinder
 from ..actions import Action
+from ..compat import ASYNC_AVAILABLE, contextvars, string_types
+from ..utils import get_logger_ref
+
+if ASYNC_AVAILABLE:
+    from .aio import (call_middleware_async, iscoroutinefunction,
+                      markcoroutinefunction)
 
 
 class ActionMiddleware(object):
@@ -35,3 +44,104 @@ class ActionMiddleware(object):
             action.finish()
             ActionBinder.unbind(request)
         return response
+
+
+class RequestActionMiddleware(object):
+    """
+    New-style (``MIDDLEWARE``) middleware wrapping requests into actions.
+
+    Works both under WSGI and ASGI, with sync and async views. Every
+    request gets its own action stack context. Finish events carry the
+    response status and duration; requests failing with an exception
+    (raised or turned into a response by Django) emit an error event.
+
+    Settings are read once, when Django creates the middleware:
+    ``TLOGGER_REQUEST_ID_HEADER_NAME``, ``TLOGGER_REQUEST_ACTION_NAME`` and
+    ``TLOGGER_REQUEST_LOGGER``; class attributes of subclasses take
+    precedence.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    header = None
+    action_name = None
+    logger = None
+    action_class = Action
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if self.header is None:
+            self.header = getattr(settings, 'TLOGGER_REQUEST_ID_HEADER_NAME',
+                                  'HTTP_REQUEST_ID')
+        if self.action_name is None:
+            self.action_name = getattr(settings, 'TLOGGER_REQUEST_ACTION_NAME',
+                                       'request')
+        if self.logger is None:
+            self.logger = getattr(settings, 'TLOGGER_REQUEST_LOGGER',
+                                  'tlogger.request')
+        if isinstance(self.logger, string_types):
+            self.logger = get_logger_ref(self.logger)
+
+        self._exceptions = weakref.WeakKeyDictionary()
+
+        self._async = ASYNC_AVAILABLE and iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            # Every ASGI request runs in a task with its own context
+            return call_middleware_async(self, request)
+
+        if contextvars is not None:
+            return contextvars.copy_context().run(self.handle, request)
+        return self.handle(request)
+
+    def handle(self, request):
+        action = self.start_action(request)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self.fail_action(request, action, *sys.exc_info())
+            raise
+        self.finish_action(request, action, response)
+        return response
+
+    def process_exception(self, request, exception):
+        # Django turns the exception into a response after this, remember
+        # it to emit an error instead of a finish event
+        exc_info = sys.exc_info()
+        if exc_info[1] is not exception:
+            exc_info = (type(exception), exception,
+                        getattr(exception, '__traceback__', None))
+        self._exceptions[request] = exc_info
+
+    def start_action(self, request):
+        action = self.action_class.create(
+            self.action_name,
+            self.logger,
+            guid=request.META.get(self.header),
+            context_object=self.__class__,
+        )
+        ActionBinder.bind(request, action)
+        action.start()
+        return action
+
+    def finish_action(self, request, action, response):
+        ActionBinder.unbind(request)
+        action.set_status(response.status_code,
+                          getattr(response, 'reason_phrase', ''))
+
+        exc_info = self._exceptions.pop(request, None)
+        if exc_info is None:
+            action.finish()
+        else:
+            action.fail(*exc_info)
+
+    def fail_action(self, request, action, exc_type, exc_val, exc_tb):
+        ActionBinder.unbind(request)
+        self._exceptions.pop(request, None)
+        action.set_status(500, 'Internal Server Error')
+        action.fail(exc_type, exc_val, exc_tb)
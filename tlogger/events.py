@@ -6,31 +6,79 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 
+class EventTemplate(object):
+    """
+    Field ordering and formatters of an event class for one payload shape.
+
+    Templates are computed once per distinct set of payload keys and reused
+    by every event with the same keys, see :meth:`Event.get_template`.
+    """
+
+    def __init__(self, event_class, keys):
+        self.event_class = event_class
+        self.fields = tuple(event_class.order_fields(keys))
+        self.formatters = tuple(
+            (field, getattr(event_class, 'format_%s' % field,
+                            event_class.default_format))
+            for field in self.fields
+        )
+
+
 class Event(object):
+    __slots__ = ('payload',)
+
     fields_head = ('id', 'guid', 'event', 'status',)
     fields_tail = ('raw',)
 
+    template_class = EventTemplate
+    max_templates = 1024
+    _templates = {}
+
     def __init__(self, payload):
         self.payload = payload
 
+    @classmethod
+    def order_fields(cls, keys):
+        keys = set(keys)
+
+        for field in cls.fields_head:
+            if field in keys:
+                yield field
+
+        for field in sorted(keys -
+                            set(cls.fields_head) -
+                            set(cls.fields_tail)):
+            yield field
+
+        for field in cls.fields_tail:
+            if field in keys:
+                yield field
+
+    @classmethod
+    def get_template(cls, keys):
+        cache_key = (cls, frozenset(keys))
+        try:
+            return cls._templates[cache_key]
+        except KeyError:
+            if len(cls._templates) >= cls.max_templates:
+                cls._templates.clear()
+            template = cls._templates[cache_key] = cls.template_class(cls, keys)
+            return template
+
+    @property
+    def template(self):
+        return self.get_template(self.payload)
+
     def items(self, omit=()):
-        return (self._preformat(field, value)
-                for field, value in self._iter_fields(omit=omit))
+        payload = self.payload
+        return ((field, formatter(self, payload[field]))
+                for field, formatter in self.template.formatters
+                if field not in omit)
 
     def _iter_fields(self, omit=()):
-        for field in self.fields_head:
-            if field in self.payload and field not in omit:
-                yield (field, self.payload[field])
-
-        for field in sorted(set(self.payload) -
-                            set(self.fields_head) -
-                            set(self.fields_tail)):
-            if field not in omit:
-                yield (field, self.payload[field])
-
-        for field in self.fields_tail:
-            if field in self.payload and field not in omit:
-                yield (field, self.payload[field])
+        return ((field, self.payload[field])
+                for field in self.template.fields
+                if field not in omit)
 
     def _preformat(self, field, value):
         formatter = getattr(self, 'format_%s' % field, self.default_format)
@@ -0,0 +1,77 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Running callables in executors within the current action.
+
+:func:`submit` and :func:`map` work with any ``concurrent.futures``
+executor (or anything with the same methods)::
+
+    from concurrent.futures import ThreadPoolExecutor
+    from tlogger import executor
+
+    with ThreadPoolExecutor() as pool:
+        future = executor.submit(pool, process, item)
+
+Callables are wrapped with :func:`wrap` which is picklable as long as the
+callable is, so it works with process pools too. For process pools created
+within an action, :func:`process_pool_initializer` makes all the tasks
+belong to it::
+
+    ProcessPoolExecutor(initializer=executor.process_pool_initializer,
+                        initargs=(capture_context(),))
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from .action_stack import action_stack
+from .context import ResumedContext, capture_context, resume_context
+
+
+class ContextCall(object):
+    """Callable resuming an action token around calls of `func`."""
+
+    def __init__(self, token, func):
+        self.token = token
+        self.func = func
+
+    def __call__(self, *args, **kwargs):
+        with resume_context(self.token):
+            return self.func(*args, **kwargs)
+
+
+def wrap(func):
+    """Return `func` wrapped to run within the current action."""
+    return ContextCall(capture_context(), func)
+
+
+def submit(executor, func, *args, **kwargs):
+    """``executor.submit(func, ...)`` within the current action."""
+    return executor.submit(wrap(func), *args, **kwargs)
+
+
+def map(executor, func, *iterables, **kwargs):
+    """``executor.map(func, ...)`` within the current action."""
+    return executor.map(wrap(func), *iterables, **kwargs)
+
+
+def process_pool_initializer(token=None, initializer=None, initargs=()):
+    """
+    Initializer of worker processes.
+
+    Drops actions inherited from the parent process via fork and makes
+    every task of the worker run within `token`, if given.
+
+    :param token: captured in the parent, see
+        :func:`tlogger.context.capture_context`
+    :type token: tlogger.context.ActionToken | None
+
+    :param initializer: another initializer to call with `initargs`
+    :type initializer: callable | None
+    """
+    action_stack.clear()
+    if token is not None:
+        action_stack.push(ResumedContext(token))
+    if initializer is not None:
+        initializer(*initargs)
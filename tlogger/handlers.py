@@ -0,0 +1,221 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Logging handlers writing records in batches.
+
+Stock ``StreamHandler`` and ``FileHandler`` write and flush every record,
+which costs a syscall (and a disk seek on spinning disks) per record::
+
+    import logging
+    from tlogger.handlers import BatchFileHandler
+
+    logging.getLogger('app').addHandler(BatchFileHandler('app.log'))
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import os
+import threading
+import time
+import weakref
+
+from .augments import TLoggerFormatter
+from .ring import RingWriter
+
+_monotonic = getattr(time, 'monotonic', time.time)
+_writev = getattr(os, 'writev', None)
+
+
+def _write_all(fd, chunks):
+    """Write byte chunks to `fd` with as few syscalls as possible."""
+    total = sum(len(chunk) for chunk in chunks)
+    written = _writev(fd, chunks) if _writev is not None else 0
+    if written == total:
+        return
+
+    data = memoryview(b''.join(bytes(chunk) for chunk in chunks))[written:]
+    while data:
+        data = data[os.write(fd, data):]
+
+
+class BatchFileHandler(logging.Handler):
+    """
+    Handler appending formatted records to a file in batches.
+
+    Lines are accumulated in a buffer preallocated once and written with a
+    single syscall when any of the thresholds is hit. A line not fitting
+    into the buffer is written together with it using ``os.writev``.
+    Buffered lines are also written by :meth:`flush`, which ``logging``
+    calls for every handler at exit, and by :meth:`close`.
+
+    :param filename: path of the file to append to
+    :type filename: str
+
+    :param capacity: buffer size in bytes
+    :type capacity: int
+
+    :param max_records: number of buffered records to write at
+    :type max_records: int
+
+    :param max_age: maximum number of seconds a record stays buffered for,
+        checked on emit and by a background thread; ``None`` disables
+    :type max_age: float | None
+
+    :param flush_level: records of this level and above are written
+        immediately together with everything buffered
+    :type flush_level: int
+
+    :param encoding: encoding of the file
+    :type encoding: str
+    """
+
+    terminator = '\n'
+
+    def __init__(self, filename, capacity=64 * 1024, max_records=1000,
+                 max_age=1.0, flush_level=logging.ERROR, encoding='utf-8',
+                 level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+
+        self.baseFilename = os.path.abspath(filename)
+        self.capacity = capacity
+        self.max_records = max_records
+        self.max_age = max_age
+        self.flush_level = flush_level
+        self.encoding = encoding
+
+        self._fd = os.open(self.baseFilename,
+                           os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._size = 0
+        self._count = 0
+        self._since = None
+
+        self._stopped = threading.Event()
+        self._flusher = None
+        if max_age is not None:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically,
+                args=(weakref.ref(self), max_age, self._stopped),
+                name='tlogger-batch-flusher',
+            )
+            self._flusher.daemon = True
+            self._flusher.start()
+
+    def emit(self, record):
+        try:
+            data = (self.format(record) + self.terminator).encode(
+                self.encoding)
+            size = len(data)
+            start = self._size
+
+            if start + size > self.capacity:
+                _write_all(self._fd, [self._view[:start], data])
+                self._reset()
+                return
+
+            self._view[start:start + size] = data
+            self._size = start + size
+            self._count += 1
+            if self._since is None:
+                self._since = _monotonic()
+
+            if self._count >= self.max_records or \
+                    record.levelno >= self.flush_level or \
+                    (self.max_age is not None and
+                     _monotonic() - self._since >= self.max_age):
+                self._write_buffer()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._size and self._fd is not None:
+                self._write_buffer()
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            self._stopped.set()
+            if self._fd is not None:
+                self.flush()
+                os.close(self._fd)
+                self._fd = None
+        finally:
+            self.release()
+            logging.Handler.close(self)
+
+    def _write_buffer(self):
+        _write_all(self._fd, [self._view[:self._size]])
+        self._reset()
+
+    def _reset(self):
+        self._size = 0
+        self._count = 0
+        self._since = None
+
+    def _flush_if_aged(self):
+        self.acquire()
+        try:
+            if self._since is not None and \
+                    _monotonic() - self._since >= self.max_age:
+                self.flush()
+        finally:
+            self.release()
+
+    @staticmethod
+    def _flush_periodically(handler_ref, max_age, stopped):
+        # Holds a weak reference only, so the thread doesn't keep
+        # an abandoned handler alive
+        while not stopped.wait(max_age):
+            handler = handler_ref()
+            if handler is None:
+                return
+            handler._flush_if_aged()
+            del handler
+
+
+class RingFileHandler(logging.Handler):
+    """
+    Handler appending formatted records to a memory-mapped ring file.
+
+    Keeps only the most recent records which fit into `capacity` bytes;
+    they survive a crash of the process. Use ``python -m tlogger.ring`` to
+    read the file. Records are formatted with
+    :class:`tlogger.augments.TLoggerFormatter` unless another formatter is
+    set, so lines are the same as in text logs.
+
+    :param filename: path of the ring file, see :mod:`tlogger.ring`
+    :type filename: str
+
+    :param capacity: size of the ring in bytes
+    :type capacity: int
+    """
+
+    def __init__(self, filename, capacity=16 * 1024 * 1024, encoding='utf-8',
+                 level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+        self.baseFilename = os.path.abspath(filename)
+        self.encoding = encoding
+        self.formatter = TLoggerFormatter()
+        self.ring = RingWriter(self.baseFilename, capacity)
+
+    def emit(self, record):
+        try:
+            self.ring.append(self.format(record).encode(self.encoding))
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            self.ring.close()
+        finally:
+            self.release()
+            logging.Handler.close(self)
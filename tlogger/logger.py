@@ -5,13 +5,18 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from .action_binder import ActionBinder
+from .action_binder import ActionBinder, ContextVarActionBinder
 from .action_stack import action_stack
 from .actions import Action
+from .compat import ASYNC_AVAILABLE, string_types
 from .constants import Level
+from .context import ResumedContext
 from .decorators import wrap_descriptor_method, wrap_function
 from .proxies import ContextManagerProxy, IterableProxy
-from .utils import is_descriptor
+from .utils import LoggerRef, get_logger_ref, is_descriptor
+
+if ASYNC_AVAILABLE:
+    from .aio import AsyncContextManagerProxy, AsyncIterableProxy
 
 
 try:
@@ -22,15 +27,46 @@ except ImportError:
 
 
 class Logger(object):
-    def __init__(self, name_or_logger, action_class=Action):
+    def __init__(self, name_or_logger, action_class=Action,
+                 serializer_class=None, metrics=None, span_exporter=None):
         self.logger = name_or_logger
+
+        # Passed to actions instead of a name, so the stdlib logger is
+        # resolved once for all of them, see `tlogger.utils.LoggerRef`
+        if isinstance(name_or_logger, string_types):
+            self._logger = get_logger_ref(name_or_logger)
+        else:
+            self._logger = name_or_logger
+
+        if serializer_class is not None:
+            # e.g. `tlogger.serializers.JSONSerializer`
+            action_class = type(
+                str('{}With{}'.format(action_class.__name__,
+                                      serializer_class.__name__)),
+                (action_class,),
+                {'serializer_class': serializer_class},
+            )
+        if metrics is not None:
+            # `tlogger.metrics.Metrics`
+            action_class = type(
+                str('{}WithMetrics'.format(action_class.__name__)),
+                (action_class,),
+                {'metrics': metrics},
+            )
+        if span_exporter is not None:
+            # `tlogger.tracing.SpanExporter`
+            action_class = type(
+                str('{}WithSpanExporter'.format(action_class.__name__)),
+                (action_class,),
+                {'span_exporter': span_exporter},
+            )
         self.action_class = action_class
 
     def __call__(self, func=None, **kwargs):
         if func is None:
             return self.parametrized_decorator(**kwargs)
 
-        return self._decorator(func, self.action_class, self.logger)
+        return self._decorator(func, self.action_class, self._logger)
 
     if DJANGO_AVAILABLE:
         def view(self, func=None, **kwargs):
@@ -39,7 +75,7 @@ class Logger(object):
                 params.update(kwargs)
                 return self.parametrized_decorator(**params)
 
-            return self._decorator(func, self.action_class, self.logger,
+            return self._decorator(func, self.action_class, self._logger,
                                    **params)
 
         def _get_view_defaults(self):
@@ -49,7 +85,8 @@ class Logger(object):
         action_class = kwargs.pop('action_class', self.action_class)
 
         def decorator(func):
-            return self._decorator(func, action_class, self.logger, **kwargs)
+            return self._decorator(func, action_class, self._logger,
+                                   **kwargs)
 
         return decorator
 
@@ -62,9 +99,17 @@ class Logger(object):
     def dump(self, **kwargs):
         self.event(suffix='dump_variable', payload=kwargs)
 
-    def create_ad_hoc_action(self, context_object):
-        return Action.create_ad_hoc(logger=self.logger,
-                                    context_object=context_object)
+    def create_ad_hoc_action(self, context_object=None):
+        full_name = None
+        if context_object is None:
+            # Events outside of any action are named after the logger
+            context_object = self
+            full_name = self.action_class.NAME_CHAIN_SEP.join(
+                (self.name, 'ad_hoc_action'))
+
+        return self.action_class.create_ad_hoc(logger=self._logger,
+                                               context_object=context_object,
+                                               full_name=full_name)
 
     def event(self, suffix, payload, action=None, **kwargs):
         action = action or self.get_current_action()
@@ -76,12 +121,43 @@ class Logger(object):
             action.emit_event(suffix, payload, **kwargs)
 
     def get_current_action(self):
-        return action_stack.peek()
+        action = action_stack.peek()
+        if isinstance(action, ResumedContext):
+            # Events get emitted by an ad hoc action nested in it
+            return None
+        return action
 
     def start_action(self, name, **kwargs):
-        return self.action_class(name, self.logger, **kwargs)
+        return self.action_class(name, self._logger, **kwargs)
+
+    @property
+    def metrics(self):
+        return self.action_class.metrics
+
+    @property
+    def name(self):
+        if isinstance(self.logger, string_types):
+            return self.logger
+        return getattr(self.logger, 'name', '')
+
+    def get_logger(self):
+        logger = self._logger
+
+        if isinstance(logger, LoggerRef):
+            return logger()
+
+        return logger
+
+    def is_enabled_for(self, level):
+        return self.get_logger().isEnabledFor(getattr(level, 'value', level))
 
     def _raw(self, suffix, level, msg, *args, **kwargs):
+        # Inside an action the event is emitted through the logger of the
+        # action, which checks its own level before building the event
+        if self.get_current_action() is None and \
+                not self.is_enabled_for(level):
+            return
+
         self.event(suffix, {}, level=level,
                    raw_msg=msg, raw_args=args, raw_kwargs=kwargs)
 
@@ -109,7 +185,10 @@ class Logger(object):
         self.get_current_action().set_status(code, msg)
 
     def action_for(self, func):
-        return ActionBinder.get_action(func)
+        action = ActionBinder.get_action(func)
+        if action is None:
+            action = ContextVarActionBinder.get_action(func)
+        return action
 
     def iter(self, iterable, steps=False, name=None, context_object=None,
              **kwargs):
@@ -118,12 +197,22 @@ class Logger(object):
         )
         return IterableProxy(iterable, steps=steps, action=action)
 
+    if ASYNC_AVAILABLE:
+        def aiter(self, iterable, steps=False, name=None, context_object=None,
+                  **kwargs):
+            action = self.start_action(
+                name or 'iterations', context_object=context_object, **kwargs
+            )
+            return AsyncIterableProxy(iterable, steps=steps, action=action)
+
     def context(self, context_manager, name=None, **kwargs):
         action = self.start_action(
             name or 'context', context_object=context_manager, **kwargs
         )
+        if ASYNC_AVAILABLE and hasattr(context_manager, '__aenter__'):
+            return AsyncContextManagerProxy(context_manager, action=action)
         return ContextManagerProxy(context_manager, action=action)
 
 
-def get_logger(name, logger_class=Logger):
-    return logger_class(name)
+def get_logger(name, logger_class=Logger, **kwargs):
+    return logger_class(name, **kwargs)
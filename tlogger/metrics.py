@@ -0,0 +1,320 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+In-process aggregation of action statistics.
+
+Actions of a class with :attr:`tlogger.actions.Action.metrics` set count
+calls, errors and status codes and record durations per full action name
+instead of logging start and finish events (errors are still logged)::
+
+    from tlogger import get_logger
+    from tlogger.metrics import Metrics
+
+    metrics = Metrics(interval=60)
+    logger = get_logger(__name__, metrics=metrics)
+
+    @logger
+    def hot_function():
+        ...
+
+    metrics.snapshot()['module.hot_function'].percentile(0.99)
+
+Every `interval` seconds one ``<action name>.summary`` event per action
+called in the interval is logged.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from array import array
+import atexit
+import os
+import sys
+import threading
+import traceback
+import weakref
+
+from .actions import Action
+from .constants import Level
+from .utils import get_logger_ref
+
+# Histogram buckets are log-linear (like HdrHistogram): values below
+# 2 ** SUB_BUCKET_BITS microseconds are exact, larger ones are kept with
+# SUB_BUCKET_BITS - 1 significant bits, i.e. ~3% relative error.
+SUB_BUCKET_BITS = 5
+MAX_SHIFT = 32  # up to 2 ** 37 us, about 38 hours
+
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+BUCKET_COUNT = (MAX_SHIFT + 2) * _HALF
+
+try:
+    array(str('Q'))
+    _COUNTER_TYPE = str('Q')
+except ValueError:  # Python 2
+    _COUNTER_TYPE = str('L')
+
+
+def bucket_index(value):
+    """Return histogram bucket of a non-negative integer `value`."""
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    if shift <= 0:
+        return value
+    if shift > MAX_SHIFT:
+        return BUCKET_COUNT - 1
+    return shift * _HALF + (value >> shift)
+
+
+def bucket_bounds(index):
+    """Return ``(lowest, highest)`` values counted in bucket `index`."""
+    if index < 2 * _HALF:
+        return index, index
+    shift = index // _HALF - 1
+    lowest = (index - shift * _HALF) << shift
+    return lowest, lowest + (1 << shift) - 1
+
+
+class ActionStats(object):
+    """
+    Statistics of one action name: counts, status codes and a histogram
+    of durations in microseconds.
+    """
+
+    __slots__ = ('count', 'errors', 'statuses', 'timed', 'duration_sum',
+                 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.statuses = {}
+        self.timed = 0
+        self.duration_sum = 0
+        self.histogram = array(_COUNTER_TYPE, [0]) * BUCKET_COUNT
+
+    def add(self, duration_ns, status_code=0, error=False):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        if duration_ns is not None:
+            self.timed += 1
+            self.duration_sum += duration_ns
+            self.histogram[bucket_index(duration_ns // 1000)] += 1
+
+    def merge(self, other, sign=1):
+        """Add (or subtract with `sign` of -1) counters of `other`."""
+        self.count += sign * other.count
+        self.errors += sign * other.errors
+        for status_code, count in list(other.statuses.items()):
+            count = self.statuses.get(status_code, 0) + sign * count
+            if count:
+                self.statuses[status_code] = count
+            else:
+                self.statuses.pop(status_code, None)
+        self.timed += sign * other.timed
+        self.duration_sum += sign * other.duration_sum
+        histogram = self.histogram
+        for index, count in enumerate(other.histogram):
+            if count:
+                histogram[index] += sign * count
+
+    def copy(self):
+        stats = ActionStats()
+        stats.merge(self)
+        return stats
+
+    def mean(self):
+        """Return mean duration in milliseconds, or None."""
+        if not self.timed:
+            return None
+        return self.duration_sum / self.timed / 1e6
+
+    def percentile(self, q):
+        """
+        Return duration in milliseconds `q` (0..1) of timed calls took at
+        most, up to the histogram precision, or None.
+        """
+        if not self.timed:
+            return None
+
+        rank = max(1, int(round(q * self.timed)))
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank:
+                return bucket_bounds(index)[1] / 1e3
+        return bucket_bounds(BUCKET_COUNT - 1)[1] / 1e3
+
+    def summary(self):
+        """Return fields of a summary event."""
+        fields = {
+            'count': self.count,
+            'errors': self.errors,
+            'status_codes': dict(self.statuses),
+        }
+        if self.timed:
+            fields.update(
+                duration_ms_mean=round(self.mean(), 3),
+                duration_ms_p50=self.percentile(0.5),
+                duration_ms_p90=self.percentile(0.9),
+                duration_ms_p99=self.percentile(0.99),
+                duration_ms_max=self.percentile(1.0),
+            )
+        return fields
+
+
+class Metrics(object):
+    """
+    Statistics of actions per full action name.
+
+    Every thread records into its own shard, so recording takes no locks;
+    shards are merged on read. The shard of a finished thread is folded into
+    a retired aggregate, so threads coming and going don't add up.
+
+    :param interval: seconds between summary events; ``None`` disables
+        them, :meth:`emit_summary` may still be called manually
+    :type interval: float | None
+
+    :param logger: logger name or object to log summary events to
+    :type logger: str | logging.Logger
+
+    :param level: level of summary events
+    :type level: tlogger.constants.Level
+
+    :param log_events: whether actions still log start and finish events
+    :type log_events: bool
+
+    :param action_class: class whose serializer writes summary events
+    :type action_class: type
+    """
+
+    def __init__(self, interval=None, logger='tlogger.metrics',
+                 level=Level.info, log_events=False, action_class=Action):
+        self.interval = interval
+        self.logger = logger
+        self.level = level
+        self.log_events = log_events
+        self.action_class = action_class
+
+        self._local = threading.local()
+        self._shards = {}  # weak reference to owner: shard
+        self._retired = {}
+        self._lock = threading.RLock()
+        self._reported = {}
+        self._reporter = None
+        self._stopped = threading.Event()
+
+        if hasattr(os, 'register_at_fork'):  # Python 3.7+
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def record(self, name, duration_ns=None, status_code=0, error=False):
+        """Count a call of action `name`, see :meth:`ActionStats.add`."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+
+        stats = shard.get(name)
+        if stats is None:
+            stats = shard[name] = ActionStats()
+        stats.add(duration_ns, status_code, error)
+
+    def snapshot(self):
+        """Return ``{action name: ActionStats}`` merged from all threads."""
+        with self._lock:
+            shards = list(self._shards.values())
+            merged = {name: stats.copy()
+                      for name, stats in self._retired.items()}
+
+        for shard in shards:
+            for name, stats in list(shard.items()):
+                if name in merged:
+                    merged[name].merge(stats)
+                else:
+                    merged[name] = stats.copy()
+        return merged
+
+    def emit_summary(self):
+        """Log statistics of actions called since the previous summary."""
+        snapshot = self.snapshot()
+        logger = self.logger
+        if not hasattr(logger, 'log'):
+            logger = get_logger_ref(logger)()
+
+        for name in sorted(snapshot):
+            stats = snapshot[name]
+            reported = self._reported.get(name)
+            self._reported[name] = stats
+            if reported is not None:
+                stats = stats.copy()
+                stats.merge(reported, sign=-1)
+            if not stats.count:
+                continue
+
+            fields = stats.summary()
+            fields['event'] = self.action_class.NAME_SUFFIX_SEP.join(
+                (name, 'summary'))
+            self.action_class.write_event(logger, self.level, None, fields,
+                                          None, {})
+
+    def stop(self):
+        """Stop periodic summaries and log the last one."""
+        reporter, self._reporter = self._reporter, None
+        if reporter is None:
+            return
+        self._stopped.set()
+        reporter.join()
+        self.emit_summary()
+
+    def _new_shard(self):
+        # The owner is referenced by the thread-local only: it goes away
+        # with the thread, which retires the shard
+        owner = _ShardOwner()
+        shard = self._local.shard = {}
+        self._local.owner = owner
+        with self._lock:
+            self._shards[weakref.ref(owner, self._retire)] = shard
+            if self.interval is not None and self._reporter is None:
+                self._start_reporter()
+        return shard
+
+    def _retire(self, owner_ref):
+        with self._lock:
+            shard = self._shards.pop(owner_ref, None)
+            if shard is None:
+                return
+            retired = self._retired
+            for name, stats in list(shard.items()):
+                if name in retired:
+                    retired[name].merge(stats)
+                else:
+                    retired[name] = stats
+
+    def _start_reporter(self):
+        self._stopped = threading.Event()
+        self._reporter = threading.Thread(target=self._report,
+                                          name='tlogger-metrics')
+        self._reporter.daemon = True
+        self._reporter.start()
+        atexit.register(self.stop)
+
+    def _reset_after_fork(self):
+        # The reporter thread doesn't survive fork, neither should counts
+        # of the parent
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+        self._lock = threading.RLock()
+        self._reported = {}
+        self._reporter = None
+
+    def _report(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.emit_summary()
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+
+
+class _ShardOwner(object):
+    __slots__ = ('__weakref__',)
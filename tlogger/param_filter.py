@@ -0,0 +1,192 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Hiding and cleansing of action params.
+
+`hide_params` and `sensitive_params` of an action accept:
+
+* plain names: hidden params are removed from the top level params and
+  from `call_params`, sensitive ones are replaced in `call_params`;
+* dotted paths, e.g. ``call_params.user.password``, matched at any depth
+  of nested dicts;
+* glob patterns, e.g. ``*password*`` or ``call_params.*_token``, matched
+  against names or, when they contain a dot, against paths.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import fnmatch
+import re
+
+from .compat import string_types
+
+
+HIDE = 'hide'
+CLEANSE = 'cleanse'
+KEEP = 'keep'
+DESCEND = 'descend'
+
+PATH_SEP = '.'
+CALL_PARAMS = 'call_params'
+
+_GLOB_CHARS = frozenset('*?[')
+_NOTHING_MEMOIZED = {}
+
+
+def _compile_globs(patterns):
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(p) for p in patterns)).match
+
+
+class _Rules(object):
+    def __init__(self, entries):
+        names, paths, name_globs, path_globs = set(), set(), [], []
+
+        for entry in entries:
+            is_glob = bool(_GLOB_CHARS.intersection(entry))
+            is_path = PATH_SEP in entry
+            if is_glob:
+                (path_globs if is_path else name_globs).append(entry)
+            else:
+                (paths if is_path else names).add(entry)
+
+        self.names = frozenset(names)
+        self.paths = frozenset(paths)
+        self.match_name = _compile_globs(name_globs)
+        self.match_path = _compile_globs(path_globs)
+        self.prefixes = frozenset(
+            PATH_SEP.join(path.split(PATH_SEP)[:i])
+            for path in self.paths.union(path_globs)
+            for i in range(1, path.count(PATH_SEP) + 1)
+        )
+        self.has_path_globs = bool(path_globs)
+
+    def matches(self, name, path, by_name):
+        if by_name and (name in self.names or
+                        self.match_name is not None and self.match_name(name)):
+            return True
+        return path in self.paths or (self.match_path is not None and
+                                      self.match_path(path) is not None)
+
+
+class ParamFilter(object):
+    """
+    Hide/cleanse rules compiled into a memoized disposition per param path.
+
+    :param hide_params: params to remove from events
+    :type hide_params: collections.Iterable
+
+    :param sensitive_params: params to replace with `substitute`
+    :type sensitive_params: collections.Iterable
+    """
+
+    max_compiled = 1024
+    _compiled = {}
+
+    # Path globs make every nested key memoized, including ones as unique
+    # as uuids, so the memo is dropped when it grows this big
+    max_dispositions = 4096
+
+    def __init__(self, hide_params=(), sensitive_params=(),
+                 substitute='******'):
+        self.hide_params = tuple(hide_params or ())
+        self.sensitive_params = tuple(sensitive_params or ())
+        self.substitute = substitute
+
+        self._hide = _Rules(self.hide_params)
+        self._sensitive = _Rules(self.sensitive_params)
+        self._descend = frozenset((CALL_PARAMS,)).union(
+            self._hide.prefixes, self._sensitive.prefixes)
+        self._descend_all = self._hide.has_path_globs or \
+            self._sensitive.has_path_globs
+        self._dispositions = {}
+        self._memoized = 0
+
+    @classmethod
+    def compile(cls, hide_params=None, sensitive_params=None,
+                substitute='******'):
+        """Return a shared filter for given rules, compiling it once."""
+        key = (cls, tuple(hide_params or ()), tuple(sensitive_params or ()),
+               substitute)
+        try:
+            return cls._compiled[key]
+        except KeyError:
+            if len(cls._compiled) >= cls.max_compiled:
+                cls._compiled.clear()
+            param_filter = cls._compiled[key] = cls(
+                hide_params, sensitive_params, substitute)
+            return param_filter
+
+    def disposition(self, name, parent=None):
+        """
+        Return one of :data:`HIDE`, :data:`CLEANSE`, :data:`DESCEND` (keep and
+        filter the nested dict) or :data:`KEEP` for param `name` in `parent`.
+        """
+        try:
+            return self._dispositions[parent][name]
+        except KeyError:
+            pass
+
+        if not isinstance(name, string_types):
+            return KEEP
+
+        if parent is None:
+            path = name
+        else:
+            path = PATH_SEP.join((parent, name))
+
+        if self._hide.matches(name, path, parent in (None, CALL_PARAMS)):
+            disposition = HIDE
+        elif self._sensitive.matches(name, path, parent == CALL_PARAMS):
+            disposition = CLEANSE
+        elif self._descend_all or path in self._descend:
+            disposition = DESCEND
+        else:
+            disposition = KEEP
+
+        if self._memoized >= self.max_dispositions:
+            self._dispositions = {}
+            self._memoized = 0
+        self._dispositions.setdefault(parent, {})[name] = disposition
+        self._memoized += 1
+        return disposition
+
+    def filter(self, params, target=None, render=None, parent=None):
+        """
+        Copy kept params into `target` in a single pass.
+
+        :param render: function applied to kept values which are not
+            filtered recursively
+        :type render: function | None
+
+        :return: `target`, a new dict if not given
+        :rtype: dict
+        """
+        if target is None:
+            target = {}
+
+        dispositions = self._dispositions.get(parent, _NOTHING_MEMOIZED)
+
+        for name, value in params.items():
+            try:
+                disposition = dispositions[name]
+            except KeyError:
+                disposition = self.disposition(name, parent)
+
+            if disposition is KEEP:
+                target[name] = value if render is None else render(value)
+            elif disposition is CLEANSE:
+                target[name] = self.substitute
+            elif disposition is DESCEND:
+                if isinstance(value, dict):
+                    path = name if parent is None else \
+                        PATH_SEP.join((parent, name))
+                    target[name] = self.filter(value, render=render,
+                                               parent=path)
+                else:
+                    target[name] = value if render is None else render(value)
+
+        return target
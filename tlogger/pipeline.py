@@ -0,0 +1,235 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Opt-in background emission of events.
+
+With a pipeline installed, :meth:`tlogger.actions.Action.emit_event` only
+builds the event fields and puts them into a bounded queue; serialization
+and handler dispatch happen in a background thread::
+
+    from tlogger import pipeline
+
+    pipeline.install(maxsize=10000, policy=pipeline.DROP_OLDEST)
+
+Events are queued with references to param and result values, not copies:
+values are formatted by the background thread, so a mutable value changed
+right after the event is logged in its changed state. Pass copies (or
+immutable values) of objects which are modified afterwards.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import atexit
+import logging
+import sys
+import threading
+import traceback
+
+from .actions import Action
+from .compat import queue
+
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+_STOP = object()
+
+
+class EmissionPipeline(object):
+    """
+    Bounded queue of events written by a background thread.
+
+    :param maxsize: maximum number of queued events
+    :type maxsize: int
+
+    :param policy: what to do when the queue is full: :data:`BLOCK` the
+        emitting thread, :data:`DROP_OLDEST` queued event or
+        :data:`DROP_NEWEST` (the one being emitted); dropped events are
+        counted in :attr:`dropped`
+    :type policy: str
+
+    :param timeout: maximum number of seconds to block for with
+        :data:`BLOCK` policy, after which the event is dropped
+    :type timeout: float | None
+    """
+
+    def __init__(self, maxsize=10000, policy=BLOCK, timeout=None):
+        if policy not in (BLOCK, DROP_OLDEST, DROP_NEWEST):
+            raise ValueError('Unknown backpressure policy: {!r}'.format(policy))
+
+        self.policy = policy
+        self.timeout = timeout
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='tlogger-pipeline')
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Write all queued events and stop the background thread. Events put
+        afterwards are written in the emitting thread.
+        """
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+
+        self._stopped.set()
+        # Only wakes the thread up: it may get dropped by `DROP_OLDEST`, but
+        # then the event replacing it does the same
+        self._queue.put(_STOP)
+        thread.join()
+        self._drain()
+        if hasattr(atexit, 'unregister'):  # Python 3
+            atexit.unregister(self.stop)
+
+    def flush(self):
+        """Block until all queued events are written."""
+        self._queue.join()
+
+    def put(self, item):
+        if self._stopped.is_set():
+            self.write(item)
+            return
+
+        try:
+            if self.policy == BLOCK:
+                self._queue.put(item, timeout=self.timeout)
+            else:
+                self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            if self.policy != DROP_OLDEST:
+                self._drop()
+                return
+
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                self._queue.task_done()
+                self._drop()
+
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+
+    def _drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is not _STOP:
+                    self.write(item)
+            finally:
+                self._queue.task_done()
+
+            if self._stopped.is_set() and self._queue.empty():
+                return
+
+    def _drain(self):
+        # Events put while the thread was stopping
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                if item is not _STOP:
+                    self.write(item)
+            finally:
+                self._queue.task_done()
+
+    def write(self, item):
+        action_class, logger, args, origin = \
+            item[0], item[1], item[2:-1], item[-1]
+        if isinstance(logger, logging.Logger):
+            logger = OriginLogger(logger, origin)
+        try:
+            action_class.write_event(logger, *args)
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+
+class OriginLogger(object):
+    """
+    Logger making records as if they were logged at `origin`.
+
+    Records are made in the pipeline thread, so their time and thread
+    attributes are replaced with ones captured in the emitting thread by
+    :func:`tlogger.utils.capture_record_origin`. Caller info is not
+    captured, records have none.
+    """
+
+    __slots__ = ('logger', 'origin')
+
+    def __init__(self, logger, origin):
+        self.logger = logger
+        self.origin = origin
+
+    def log(self, level, msg, *args, **kwargs):
+        logger = self.logger
+        if not logger.isEnabledFor(level):
+            return
+
+        record = logger.makeRecord(
+            logger.name, level, '(unknown file)', 0, msg, args,
+            kwargs.get('exc_info') or None, '(unknown function)',
+            kwargs.get('extra'))
+
+        created, record.thread, record.threadName = self.origin
+        record.relativeCreated += (created - record.created) * 1000
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        logger.handle(record)
+
+
+def install(action_class=Action, **kwargs):
+    """
+    Start a pipeline and make `action_class` emit events through it.
+
+    :param action_class: class of actions to emit through the pipeline
+        (including subclasses)
+    :type action_class: type
+
+    :param kwargs: :class:`EmissionPipeline` parameters
+
+    :return: started pipeline
+    :rtype: EmissionPipeline
+    """
+    uninstall(action_class)
+
+    pipeline = EmissionPipeline(**kwargs)
+    pipeline.start()
+    action_class.pipeline = pipeline
+    return pipeline
+
+
+def uninstall(action_class=Action):
+    """Flush and stop the pipeline of `action_class`, if any."""
+    pipeline = action_class.__dict__.get('pipeline')
+    if pipeline is not None:
+        action_class.pipeline = None
+        pipeline.stop()
@@ -6,11 +6,39 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import inspect
+import weakref
 
 from qualname import qualname
 
 
+_cache = weakref.WeakKeyDictionary()
+
+
 def find_qualified_name(obj):
+    """
+    Return dotted ``module.qualname`` of `obj`, memoized per object.
+
+    Bound methods are cached by their underlying function, since a new
+    bound method object is created on every attribute access.
+    """
+    key = getattr(obj, '__func__', obj)
+
+    try:
+        return _cache[key]
+    except (KeyError, TypeError):
+        pass
+
+    name = _find_qualified_name(obj)
+
+    try:
+        _cache[key] = name
+    except TypeError:  # not weak referenceable or not hashable
+        pass
+
+    return name
+
+
+def _find_qualified_name(obj):
     name = None
 
     try:
@@ -0,0 +1,94 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Lazy, size-bounded rendering of parameter values.
+
+Enable for an action class with::
+
+    Action.param_renderer = ParamRenderer(max_length=200, max_items=50)
+
+Param values are then logged as :class:`LazyRepr` objects: their
+text is only produced when a handler actually formats the record, repr of
+long values is truncated and big containers are summarized as
+``<list len=100000>``.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from .compat import string_types
+
+_SLICEABLE_TYPES = string_types + (bytes, bytearray)
+
+
+class LazyRepr(object):
+    """Value rendered by a :class:`ParamRenderer` on first ``str()``."""
+
+    __slots__ = ('value', 'renderer', '_text')
+
+    def __init__(self, value, renderer):
+        self.value = value
+        self.renderer = renderer
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = self.renderer.render(self.value)
+        return self._text
+
+    __repr__ = __unicode__ = __str__
+
+
+class ParamRenderer(object):
+    """
+    :param max_length: maximum length of rendered value, longer ones are
+        truncated and marked with `ellipsis`
+    :type max_length: int
+
+    :param max_items: containers with more items are rendered as a summary
+        of type and length only
+    :type max_items: int
+    """
+
+    # Exact types rendered as is: cheap and short
+    PLAIN_TYPES = frozenset((int, float, bool, type(None)))
+
+    ellipsis = '...'
+
+    def __init__(self, max_length=200, max_items=50):
+        self.max_length = max_length
+        self.max_items = max_items
+
+    def wrap(self, value):
+        value_type = type(value)
+        if value_type in self.PLAIN_TYPES:
+            return value
+        if value_type in string_types and len(value) <= self.max_length:
+            return value
+        return LazyRepr(value, self)
+
+    def render(self, value):
+        if isinstance(value, _SLICEABLE_TYPES):
+            if len(value) > self.max_length:
+                # Only the part which can be shown gets copied and escaped
+                text = repr(value[:self.max_length])
+                return text[:self.max_length] + self.ellipsis
+        else:
+            size = self._get_size(value)
+            if size is not None and size > self.max_items:
+                return '<{} len={}>'.format(type(value).__name__, size)
+
+        text = repr(value)
+        if len(text) > self.max_length:
+            text = text[:self.max_length] + self.ellipsis
+        return text
+
+    @staticmethod
+    def _get_size(value):
+        if not hasattr(type(value), '__len__'):
+            return None
+        try:
+            return len(value)
+        except Exception:
+            return None
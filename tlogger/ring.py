@@ -0,0 +1,300 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Fixed-size ring file of log lines, memory-mapped.
+
+The file is a header followed by a circular data area of records. Only the
+most recent records which fit into the data area are kept. Since the file
+is mapped shared, everything appended survives a crash of the writing
+process. See :class:`tlogger.handlers.RingFileHandler` for writing and the
+command line reader::
+
+    python -m tlogger.ring dump app.ring --event 'app.views.*'
+    python -m tlogger.ring tail app.ring -n 20 --follow
+    python -m tlogger.ring dump app.ring --guid 4b1a...
+
+File layout (little endian):
+
+* header, :data:`HEADER_SIZE` bytes: magic, data area capacity, logical
+  offset of the oldest record (tail), logical offset past the newest one
+  (head) and the number of records ever written;
+* data area: records, each a ``(length, sequence number)`` pair followed
+  by ``length`` bytes of an UTF-8 line. A record never wraps around: when
+  it doesn't fit before the end of the data area, the rest is skipped
+  (marked with :data:`WRAP` length if there is room for a record header).
+
+Logical offsets grow forever, position in the data area is an offset
+modulo capacity. The writer moves the tail past records it is going to
+overwrite before writing and moves the head after, so readers take no
+locks: they read records between the two and drop those whose offset
+fell behind the tail in the meantime.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import fnmatch
+import io
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+
+MAGIC = b'TLRING01'
+HEADER_SIZE = 64
+WRAP = 0xFFFFFFFF
+
+_HEADER = struct.Struct(str('<8sQQQQ'))  # magic, capacity, tail, head, seq
+_RECORD = struct.Struct(str('<IQ'))  # length, seq
+
+
+class RingWriter(object):
+    """
+    Appends lines to a ring file, creating it if needed.
+
+    An existing ring of the same capacity is appended to, so records
+    written before a restart are kept. There must be a single writing
+    process; threads are expected to serialize :meth:`append` calls (the
+    handler lock does that).
+
+    :param filename: path of the ring file
+    :type filename: str
+
+    :param capacity: size of the data area in bytes
+    :type capacity: int
+    """
+
+    def __init__(self, filename, capacity=16 * 1024 * 1024):
+        self.filename = filename
+        self.capacity = capacity
+
+        size = HEADER_SIZE + capacity
+        fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fresh = os.fstat(fd).st_size != size
+            if fresh:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        magic, stored_capacity, self.tail, self.head, self.seq = \
+            _HEADER.unpack_from(self._map, 0)
+        if fresh or magic != MAGIC or stored_capacity != capacity:
+            self.tail = self.head = self.seq = 0
+            self._write_header()
+
+    def append(self, data):
+        """Append a line (bytes), overwriting the oldest records if needed."""
+        capacity = self.capacity
+        data = data[:capacity - _RECORD.size]
+        size = _RECORD.size + len(data)
+
+        head = self.head
+        position = head % capacity
+        wrap = capacity - position < size
+        if wrap:
+            head += capacity - position
+
+        end = head + size
+        tail = self.tail
+        while end - tail > capacity:
+            if tail >= self.head:  # everything stored gets overwritten
+                tail = head
+                break
+            tail = _next_offset(self._map, capacity, tail)
+        if tail != self.tail:
+            self.tail = tail
+            self._write_header()
+
+        if wrap:
+            if capacity - position >= _RECORD.size:
+                _RECORD.pack_into(self._map, HEADER_SIZE + position, WRAP, 0)
+            position = 0
+
+        start = HEADER_SIZE + position + _RECORD.size
+        self._map[start:start + len(data)] = data
+        _RECORD.pack_into(self._map, HEADER_SIZE + position, len(data),
+                          self.seq)
+
+        self.head = end
+        self.seq += 1
+        self._write_header()
+
+    def flush(self):
+        """Write the ring to disk, only needed to survive an OS crash."""
+        self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _write_header(self):
+        _HEADER.pack_into(self._map, 0, MAGIC, self.capacity, self.tail,
+                          self.head, self.seq)
+
+
+class RingReader(object):
+    """
+    Reads records of a ring file, possibly while it is being written.
+
+    :param filename: path of the ring file
+    :type filename: str
+    """
+
+    def __init__(self, filename):
+        with io.open(filename, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.capacity = _HEADER.unpack_from(self._map, 0)[:2]
+        if magic != MAGIC:
+            raise ValueError('Not a tlogger ring file: {}'.format(filename))
+
+    def bounds(self):
+        """Return ``(tail, head)`` logical offsets of the stored records."""
+        return _HEADER.unpack_from(self._map, 0)[2:4]
+
+    def records(self, start=None, stop=None):
+        """
+        Yield ``(offset, seq, line)`` of records present now, oldest first.
+
+        :param start: logical offset to start from, e.g. one returned by
+            :meth:`bounds` earlier; older records are skipped
+        :type start: int | None
+
+        :param stop: logical offset to stop at, the current head by default
+        :type stop: int | None
+        """
+        tail, head = self.bounds()
+        offset = tail if start is None else max(start, tail)
+        if stop is not None:
+            head = stop
+
+        while offset < head:
+            position = offset % self.capacity
+            if self.capacity - position < _RECORD.size:
+                offset += self.capacity - position
+                continue
+
+            length, seq = _RECORD.unpack_from(self._map,
+                                              HEADER_SIZE + position)
+            if length == WRAP:
+                offset += self.capacity - position
+                continue
+
+            data_start = HEADER_SIZE + position + _RECORD.size
+            data = self._map[data_start:data_start + length]
+
+            tail = self.bounds()[0]
+            if offset < tail:  # overwritten while being read
+                offset = tail
+                continue
+
+            yield offset, seq, data.decode('utf-8', 'replace')
+            offset += _RECORD.size + length
+
+    def lines(self):
+        return [line for _, _, line in self.records()]
+
+    def follow(self, interval=0.5):
+        """Yield lines as they are appended, like ``tail -f``."""
+        offset = self.bounds()[1]
+        while True:
+            head = self.bounds()[1]
+            for _, _, line in self.records(offset, head):
+                yield line
+            offset = head
+            time.sleep(interval)
+
+    def close(self):
+        self._map.close()
+
+
+def _next_offset(buffer, capacity, offset):
+    position = offset % capacity
+    if capacity - position < _RECORD.size:
+        return offset + capacity - position
+
+    length = _RECORD.unpack_from(buffer, HEADER_SIZE + position)[0]
+    if length == WRAP:
+        return offset + capacity - position
+    return offset + _RECORD.size + length
+
+
+_field = re.compile(r'(?:^|\s)([\w.]+)=(?:"((?:[^"\\]|\\.)*)"|(\S*))')
+
+
+def parse_fields(line):
+    """Return ``key=value`` fields of a log line as a dict."""
+    return {key: quoted if quoted or not plain else plain
+            for key, quoted, plain in _field.findall(line)}
+
+
+def make_line_filter(event=None, guid=None):
+    """
+    Return predicate of lines with event name matching `event` glob and
+    ``guid`` or ``id`` field equal to `guid`.
+    """
+    if event is None and guid is None:
+        return lambda line: True
+
+    def line_filter(line):
+        fields = parse_fields(line)
+        if event is not None and \
+                not fnmatch.fnmatchcase(fields.get('event', ''), event):
+            return False
+        if guid is not None and guid not in (fields.get('guid'),
+                                             fields.get('id')):
+            return False
+        return True
+
+    return line_filter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m tlogger.ring',
+        description='Read tlogger ring files.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    dump = commands.add_parser('dump', help='print all stored lines')
+    tail = commands.add_parser('tail', help='print the last lines')
+    tail.add_argument('-n', '--lines', type=int, default=10,
+                      help='number of lines to print (default: 10)')
+    tail.add_argument('-f', '--follow', action='store_true',
+                      help='keep printing appended lines')
+    for command in (dump, tail):
+        command.add_argument('filename')
+        command.add_argument('--event', help='event name glob')
+        command.add_argument('--guid', help='guid (or id) of actions')
+
+    args = parser.parse_args(argv)
+    line_filter = make_line_filter(args.event, args.guid)
+
+    reader = RingReader(args.filename)
+    try:
+        lines = [line for line in reader.lines() if line_filter(line)]
+        if args.command == 'tail':
+            lines = lines[-args.lines:] if args.lines > 0 else []
+        for line in lines:
+            print(line)
+
+        if args.command == 'tail' and args.follow:
+            for line in reader.follow():
+                if line_filter(line):
+                    print(line)
+                    sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
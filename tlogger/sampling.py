@@ -0,0 +1,54 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Sampling of actions.
+
+An action is sampled when it starts: a root action (the first on the action
+stack) is kept with probability of its rate, nested actions inherit the
+decision of their parent and may additionally be thinned with their own
+rate. Events of unsampled actions are not built at all, except error events
+(``fail()`` and error-level messages) when `always_on_error` is set::
+
+    Action.sampler = Sampler(rate=0.01, rates={'app.views.health': 0.001})
+
+A rate can also be given per decorated function::
+
+    @logger(sample_rate=0.1)
+    def hot_function():
+        ...
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import random
+
+
+class Sampler(object):
+    """
+    :param rate: probability to keep a root action without an own rate
+    :type rate: float
+
+    :param rates: probabilities to keep actions with given full names
+        (e.g. ``'module.function'``), root or nested
+    :type rates: dict
+
+    :param always_on_error: emit error events of unsampled actions
+    :type always_on_error: bool
+    """
+
+    def __init__(self, rate=1.0, rates=None, always_on_error=True):
+        self.rate = rate
+        self.rates = rates or {}
+        self.always_on_error = always_on_error
+
+    def get_rate(self, name, root=False):
+        try:
+            return self.rates[name]
+        except KeyError:
+            return self.rate if root else None
+
+    @staticmethod
+    def sample(rate):
+        return rate is None or rate >= 1 or random.random() < rate
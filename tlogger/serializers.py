@@ -5,19 +5,252 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from itertools import chain
+import json
+import re
+
+from .compat import PY3
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Everything but printable ASCII and a backslash gets escaped
+_needs_escape = re.compile(r'[^\x20-\x5b\x5d-\x7e]').search
+
+# Types which `str()` of never needs escaping (exact types, not subclasses)
+if PY3:
+    _PLAIN_TYPES = frozenset((int, float, bool))
+else:
+    _PLAIN_TYPES = frozenset((int, long, float, bool))  # noqa: F821
+
+
+def escape_inline(value):
+    """
+    Return ``str(value)`` with non-printable and non-ASCII characters escaped.
+
+    Same as ``str(value).encode('unicode_escape').decode()``, but numbers,
+    booleans and strings which need no escaping skip the codec round-trip.
+    """
+    if type(value) in _PLAIN_TYPES:
+        return str(value)
+
+    value = str(value)
+    if _needs_escape(value) is None:
+        return value
+
+    return value.encode('unicode_escape').decode()
+
+
+def quote_argument(value):
+    """Return :func:`escape_inline` result in double quotes."""
+    # Inlined `escape_inline()`, this is called for every logged value
+    if type(value) in _PLAIN_TYPES:
+        return '"%s"' % value
+
+    value = str(value)
+    if _needs_escape(value) is None:
+        return '"%s"' % value
+
+    return '"%s"' % value.encode('unicode_escape').decode()
+
+
+class KeyValueTemplate(object):
+    """
+    Format string pieces and argument fields for one event template.
+
+    Fields listed in `inline` are rendered into the format string itself,
+    the rest become ``key=%s`` placeholders, see :class:`KeyValueSerializer`.
+    """
+
+    def __init__(self, event_template, inline=()):
+        self.arguments = tuple(
+            (field, formatter)
+            for field, formatter in event_template.formatters
+            if field not in inline
+        )
+        self.inline = tuple(
+            (field, formatter)
+            for field, formatter in event_template.formatters
+            if field in inline
+        )
+
+        self.parts = tuple(
+            (field, formatter) if field in inline else ('{}=%s'.format(field), None)
+            for field, formatter in event_template.formatters
+        )
+        self.format_string = None
+        if not self.inline:
+            self.format_string = ' '.join(part for part, _ in self.parts)
+
+    def render_format_string(self, event):
+        if self.format_string is not None:
+            return self.format_string
+
+        payload = event.payload
+        return ' '.join(
+            part if formatter is None else '{}="{}"'.format(
+                part, escape_inline(formatter(event, payload[part])))
+            for part, formatter in self.parts
+        )
+
+    def render_arguments(self, event):
+        payload = event.payload
+        return [formatter(event, payload[field])
+                for field, formatter in self.arguments]
+
 
 class KeyValueSerializer(object):
+    template_class = KeyValueTemplate
+    max_templates = 1024
+    _templates = {}
+
     def __init__(self, event, inline=()):
         self.event = event
         self.inline = inline
 
+    @classmethod
+    def get_template(cls, event_template, inline=()):
+        cache_key = (cls, event_template, tuple(inline))
+        try:
+            return cls._templates[cache_key]
+        except KeyError:
+            if len(cls._templates) >= cls.max_templates:
+                cls._templates.clear()
+            template = cls._templates[cache_key] = cls.template_class(
+                event_template, inline)
+            return template
+
+    @property
+    def template(self):
+        return self.get_template(self.event.template, self.inline)
+
     def format_string(self):
-        return ' '.join(
-            '{}=%s'.format(k)
-            if k not in self.inline
-            else '{}="{}"'.format(k, str(v).encode('unicode_escape').decode())
-            for k, v in self.event.items()
-        )
+        return self.template.render_format_string(self.event)
 
     def arguments(self):
-        return [v for k, v in self.event.items(omit=self.inline)]
+        return self.template.render_arguments(self.event)
+
+    def render(self):
+        template = self.template
+        return (template.render_format_string(self.event),
+                template.render_arguments(self.event))
+
+    def log_args(self, raw_args=None):
+        """
+        Return message and arguments to pass to ``logging.Logger.log``.
+
+        :param raw_args: arguments of the inline ``raw`` message
+        :type raw_args: collections.Iterable | None
+        """
+        format_string, arguments = self.render()
+        return format_string, chain(arguments, raw_args or ())
+
+
+if orjson is not None:
+    def json_dumps(obj):
+        return orjson.dumps(obj, default=str,
+                            option=orjson.OPT_NON_STR_KEYS).decode()
+elif ujson is not None:
+    def json_dumps(obj):
+        return ujson.dumps(obj, default=str, ensure_ascii=False)
+else:
+    def json_dumps(obj):
+        return json.dumps(obj, default=str, ensure_ascii=False,
+                          separators=(',', ':'))
+
+
+class StructuredMessage(object):
+    """
+    Log message carrying event fields as a dict.
+
+    Handlers aware of it can use :attr:`fields` or :meth:`encode` directly;
+    everything else gets the text produced by the serializer on ``str()``.
+    Interpolation of the ``raw`` message and encoding happen on first use.
+    """
+
+    def __init__(self, fields, raw_args, serializer_class):
+        self._fields = fields
+        self._raw_args = raw_args
+        self.serializer_class = serializer_class
+        self._encoded = self._text = None
+
+    @property
+    def fields(self):
+        if self._raw_args:
+            self._fields['raw'] = self._fields['raw'] % tuple(self._raw_args)
+            self._raw_args = None
+        return self._fields
+
+    def encode(self):
+        if self._encoded is None:
+            self._encoded = self.serializer_class.dumps(self.fields)
+        return self._encoded
+
+    def __str__(self):
+        if self._text is None:
+            self._text = self.serializer_class.dumps_text(self.fields)
+        return self._text
+
+    __unicode__ = __str__
+
+
+class StructuredSerializer(object):
+    """
+    Base class of serializers passing events as :class:`StructuredMessage`.
+
+    No ``%`` formatting is involved: the message has no arguments.
+    """
+
+    def __init__(self, event, inline=()):
+        self.event = event
+
+    @staticmethod
+    def dumps(fields):
+        raise NotImplementedError
+
+    @classmethod
+    def dumps_text(cls, fields):
+        return cls.dumps(fields)
+
+    def log_args(self, raw_args=None):
+        fields = dict(self.event.items())
+        return StructuredMessage(fields, raw_args, self.__class__), ()
+
+
+class JSONSerializer(StructuredSerializer):
+    """Serializes events to JSON with orjson, ujson or json module."""
+
+    dumps = staticmethod(json_dumps)
+
+
+class MsgpackSerializer(StructuredSerializer):
+    """
+    Serializes events to msgpack bytes (:meth:`StructuredMessage.encode`).
+
+    Text handlers get JSON, since msgpack is binary.
+    """
+
+    def __init__(self, event, inline=()):
+        if msgpack is None:
+            raise ImportError('msgpack package is required for '
+                              'MsgpackSerializer')
+        super(MsgpackSerializer, self).__init__(event, inline)
+
+    @staticmethod
+    def dumps(fields):
+        return msgpack.packb(fields, default=str, use_bin_type=True)
+
+    dumps_text = staticmethod(json_dumps)
@@ -0,0 +1,361 @@
+# -*- mode: python; coding: utf-8; -*-
+"""
+Export of actions as OpenTelemetry spans.
+
+Actions nested via the action stack form a trace: every action becomes a
+span, its parent on the stack is the parent span and the guid of the root
+action (e.g. the request guid of :class:`tlogger.django.middleware.
+ActionMiddleware`) is the trace id. Spans are batched and passed to a
+sink as OTLP/JSON ``ExportTraceServiceRequest`` dicts::
+
+    from tlogger import get_logger
+    from tlogger.tracing import OTLPHTTPSink, SpanExporter
+
+    exporter = SpanExporter(OTLPHTTPSink('http://localhost:4318/v1/traces'),
+                            service_name='app', log_events=False)
+    logger = get_logger(__name__, span_exporter=exporter)
+
+With `log_events` off, start and finish events are not logged at all, so
+no text is formatted for them.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import atexit
+import hashlib
+import io
+import re
+import sys
+import threading
+import traceback
+
+from .compat import string_types, time_ns
+from .serializers import json_dumps
+from .utils import create_random_guid
+
+try:
+    from urllib.request import Request, urlopen
+except ImportError:  # Python 2
+    from urllib2 import Request, urlopen
+
+# Span kinds and status codes of the OTLP protocol
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+
+_hex = re.compile(r'^[0-9a-f]{1,32}$')
+
+
+def trace_id_from_guid(guid):
+    """
+    Return 32 hex digits trace id of a guid.
+
+    Guids which are hex numbers of up to 128 bits (uuids including) are
+    used as is, anything else is hashed.
+    """
+    text = str(guid).replace('-', '').lower()
+    if _hex.match(text) and int(text, 16):
+        return text.zfill(32)
+    return hashlib.sha256(str(guid).encode('utf-8')).hexdigest()[:32]
+
+
+def attribute_value(value):
+    """Return OTLP ``AnyValue`` of a param value."""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if not isinstance(value, string_types):
+        value = str(value)
+    return {'stringValue': value}
+
+
+def attributes(fields, prefix=''):
+    """Return OTLP attributes of a dict, nested dicts are flattened."""
+    result = []
+    for key in sorted(fields):
+        value = fields[key]
+        if isinstance(value, dict):
+            result.extend(attributes(value, '{}{}.'.format(prefix, key)))
+        else:
+            result.append({'key': prefix + str(key),
+                           'value': attribute_value(value)})
+    return result
+
+
+class SpanExporter(object):
+    """
+    Turns finished actions into spans and passes them to `sink` in batches.
+
+    The sink is called from a background thread, so actions never wait for
+    it. Spans of a batch the sink failed on are kept for the next attempt,
+    which is delayed exponentially (from `interval` up to
+    :attr:`max_backoff` seconds); only the first error of a series is
+    reported to stderr, all are counted in :attr:`sink_errors`.
+
+    :param sink: callable taking an OTLP/JSON ``ExportTraceServiceRequest``
+        dict, e.g. :class:`OTLPJSONFileSink` or :class:`OTLPHTTPSink`
+    :type sink: callable
+
+    :param service_name: ``service.name`` resource attribute
+    :type service_name: str | None
+
+    :param max_batch: number of spans to pass to the sink at once
+    :type max_batch: int
+
+    :param interval: maximum number of seconds a span is kept in a batch
+        for; ``None`` leaves batches till full or :meth:`flush`
+    :type interval: float | None
+
+    :param max_queue: number of spans kept while the sink is failing or
+        falling behind, the oldest ones are dropped beyond it
+    :type max_queue: int
+
+    :param log_events: whether actions still log start and finish events
+    :type log_events: bool
+    """
+
+    scope_name = 'tlogger'
+    max_backoff = 300.0
+
+    def __init__(self, sink, service_name=None, max_batch=512, interval=5.0,
+                 log_events=True, max_queue=8192):
+        self.sink = sink
+        self.max_batch = max_batch
+        self.interval = interval
+        self.max_queue = max_queue
+        self.log_events = log_events
+
+        resource = {}
+        if service_name is not None:
+            resource['service.name'] = service_name
+        self.resource = {'attributes': attributes(resource)}
+
+        self._batch = []
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stopped = threading.Event()
+        self._wake = threading.Event()
+        self._backing_off = False
+        self.dropped = 0
+        self.sink_errors = 0
+
+    def start_span(self, action, parent):
+        """
+        Return span state of a started `action`, see
+        :meth:`tlogger.actions.Action.start`.
+
+        :param parent: action `action` is nested in
+        :type parent: tlogger.actions.Action | None
+        """
+        parent_span = getattr(parent, '_span', None)
+        if parent_span is not None:
+            trace_id, parent_span_id = parent_span[0], parent_span[1]
+        else:
+            uid_item = action._get_root_uid_item()
+            trace_id = trace_id_from_guid(next(iter(uid_item.values())))
+            parent_span_id = ''
+        return trace_id, create_random_guid(), parent_span_id, time_ns()
+
+    def end_span(self, action, span, duration_ns, error=False,
+                 exc_type=None, exc_val=None):
+        """Export span of a finished (or failed) action."""
+        trace_id, span_id, parent_span_id, start_time = span
+        end_time = start_time + duration_ns
+
+        renderer = action.param_renderer
+        fields = action.param_filter.filter(
+            action.params, target={},
+            render=renderer.wrap if renderer is not None else None)
+        fields['status_code'] = action.status_code
+        if action.status_message:
+            fields['status_msg'] = action.status_message
+
+        record = {
+            'traceId': trace_id,
+            'spanId': span_id,
+            'parentSpanId': parent_span_id,
+            'name': action._get_full_name(),
+            'kind': SPAN_KIND_INTERNAL,
+            'startTimeUnixNano': str(start_time),
+            'endTimeUnixNano': str(end_time),
+            'attributes': attributes(fields),
+            'status': {'code': STATUS_CODE_UNSET},
+        }
+
+        if error:
+            message = str(exc_val) if exc_val is not None else \
+                action.status_message
+            record['status'] = {'code': STATUS_CODE_ERROR,
+                                'message': message}
+            exception = {}
+            if exc_type is not None:
+                exception['exception.type'] = getattr(
+                    exc_type, '__name__', str(exc_type))
+            if exc_val is not None:
+                exception['exception.message'] = str(exc_val)
+            record['events'] = [{
+                'name': 'exception',
+                'timeUnixNano': str(end_time),
+                'attributes': attributes(exception),
+            }]
+
+        self.export(record)
+
+    def export(self, span):
+        """
+        Add OTLP/JSON span dict to the batch, a full batch is handed to the
+        flusher thread.
+        """
+        with self._lock:
+            batch = self._batch
+            batch.append(span)
+            if len(batch) > self.max_queue:
+                del batch[0]
+                self.dropped += 1
+            if self._flusher is None:
+                self._start_flusher()
+            if len(batch) >= self.max_batch and not self._backing_off:
+                self._wake.set()
+
+    def flush(self):
+        """
+        Pass batched spans to the sink in the calling thread.
+
+        Spans the sink raised on are put back, so :meth:`flush` retries them.
+        """
+        with self._lock:
+            batch, self._batch = self._batch, []
+
+        for start in range(0, len(batch), self.max_batch):
+            try:
+                self.sink(self._request(batch[start:start + self.max_batch]))
+            except Exception:
+                self._requeue(batch[start:])
+                raise
+
+    def stop(self):
+        """Stop the flusher thread and flush the batch."""
+        flusher, self._flusher = self._flusher, None
+        if flusher is None:
+            self.flush()
+            return
+        self._stopped.set()
+        self._wake.set()
+        flusher.join()
+        if hasattr(atexit, 'unregister'):  # Python 3
+            atexit.unregister(self.stop)
+
+    def _request(self, spans):
+        return {'resourceSpans': [{
+            'resource': self.resource,
+            'scopeSpans': [{
+                'scope': {'name': self.scope_name},
+                'spans': spans,
+            }],
+        }]}
+
+    def _requeue(self, spans):
+        with self._lock:
+            batch = spans + self._batch
+            overflow = len(batch) - self.max_queue
+            if overflow > 0:
+                del batch[:overflow]
+                self.dropped += overflow
+            self._batch = batch
+
+    def _start_flusher(self):
+        self._stopped = threading.Event()
+        self._wake = threading.Event()
+        self._backing_off = False
+        self._flusher = threading.Thread(
+            target=self._flush_periodically,
+            args=(self._stopped, self._wake),
+            name='tlogger-span-exporter',
+        )
+        self._flusher.daemon = True
+        self._flusher.start()
+        atexit.register(self.stop)
+
+    def _flush_periodically(self, stopped, wake):
+        # Woken up by a full batch, or every `interval` seconds. After a
+        # failure full batches don't wake it up till the next attempt.
+        delay = self.interval
+        failures = 0
+        while True:
+            wake.wait(delay)
+            wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                if not failures:
+                    traceback.print_exc(file=sys.stderr)
+                failures += 1
+                self.sink_errors += 1
+                delay = min((self.interval or 1.0) * 2 ** failures,
+                            self.max_backoff)
+                self._backing_off = True
+            else:
+                if failures:
+                    print('tlogger: span sink recovered after {} failed '
+                          'attempts'.format(failures), file=sys.stderr)
+                failures = 0
+                delay = self.interval
+                self._backing_off = False
+
+            if stopped.is_set():
+                return
+
+
+class OTLPJSONFileSink(object):
+    """
+    Appends requests to a file as JSON lines, like the file exporter of
+    OpenTelemetry Collector.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        line = json_dumps(request) + '\n'
+        with self._lock:
+            with io.open(self.filename, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+class OTLPHTTPSink(object):
+    """
+    Posts requests to an OTLP/HTTP endpoint of a collector in JSON.
+
+    :param endpoint: URL of the traces endpoint
+    :type endpoint: str
+
+    :param headers: extra HTTP headers, e.g. for authentication
+    :type headers: dict | None
+
+    :param timeout: seconds to wait for the collector
+    :type timeout: float
+    """
+
+    def __init__(self, endpoint='http://localhost:4318/v1/traces',
+                 headers=None, timeout=10.0):
+        self.endpoint = endpoint
+        self.headers = dict(headers or {})
+        self.headers['Content-Type'] = 'application/json'
+        self.timeout = timeout
+
+    def __call__(self, request):
+        body = json_dumps(request).encode('utf-8')
+        response = urlopen(Request(str(self.endpoint), data=body,
+                                   headers=self.headers),
+                           timeout=self.timeout)
+        try:
+            response.read()
+        finally:
+            response.close()
@@ -5,8 +5,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from binascii import hexlify
+from itertools import count
 from logging import getLogger
 from uuid import uuid4
+import os
+import sys
+import threading
+import time
 
 
 def create_logger(name):
@@ -14,10 +20,106 @@ def create_logger(name):
     return logger
 
 
+class LoggerRef(object):
+    """
+    ``logging.Logger`` of a given name, resolved on first use.
+
+    ``logging.getLogger`` takes the logging module lock, so the logger is
+    cached instead of being looked up for every event. On every call the
+    cached logger is checked against the logging manager registry, which
+    is a lock-free dict lookup: a logger replaced after reconfiguration
+    (e.g. cleared ``loggerDict``) is resolved again. Loggers which are
+    merely reconfigured in place (levels, handlers, ``disabled``) need no
+    special handling.
+    """
+
+    __slots__ = ('name', '_logger')
+
+    def __init__(self, name):
+        self.name = name
+        self._logger = None
+
+    def __call__(self):
+        logger = self._logger
+        if logger is None or \
+                logger.manager.loggerDict.get(self.name, logger.root) \
+                is not logger:
+            logger = self._logger = create_logger(self.name)
+        return logger
+
+    def __repr__(self):
+        return str('LoggerRef({!r})'.format(self.name))
+
+
+_logger_refs = {}
+
+
+def get_logger_ref(name):
+    """Return :class:`LoggerRef` of `name` shared by all its users."""
+    try:
+        return _logger_refs[name]
+    except KeyError:
+        return _logger_refs.setdefault(name, LoggerRef(name))
+
+
 def create_guid():
     return str(uuid4())
 
 
+def create_random_guid():
+    """Return 64 random bits as 16 hex digits."""
+    return hexlify(os.urandom(8)).decode()
+
+
+class CounterGuidFactory(object):
+    """
+    Guids made of a random per-process prefix and a sequence number.
+
+    Much cheaper than uuid4, yet unique across processes: the prefix is
+    regenerated in forked children. ``next()`` on :func:`itertools.count`
+    is atomic in CPython, so no lock is needed.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._prefix = create_random_guid()
+        self._counter = count()
+
+    def __call__(self):
+        if self._pid != os.getpid():
+            self._reset()
+        return '{}-{:x}'.format(self._prefix, next(self._counter))
+
+
+create_counter_guid = CounterGuidFactory()
+
+
+def capture_exc_info(exc_info):
+    """
+    Resolve `exc_info` argument of ``logging.Logger.log`` to a tuple.
+
+    Needed when the record is created later or in another thread, where
+    ``sys.exc_info()`` no longer refers to the exception being handled.
+    """
+    if isinstance(exc_info, BaseException):
+        return type(exc_info), exc_info, getattr(exc_info, '__traceback__', None)
+    if not isinstance(exc_info, tuple):
+        return sys.exc_info()
+    return exc_info
+
+
+def capture_record_origin():
+    """
+    Return ``(created, thread id, thread name)`` of a record being emitted
+    now, see :class:`tlogger.pipeline.EmissionPipeline`.
+    """
+    thread = threading.current_thread()
+    return time.time(), thread.ident, thread.name
+
+
 def is_descriptor(obj):
     if (
         hasattr(obj, '__get__') or